@@ -0,0 +1,192 @@
+# admission.py
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+# Controle de admissão das requisições de sumarização. O custo de cada
+# requisição é estimado em "caracteres de geração": o texto que passa pelo
+# modelo multiplicado pelo número de feixes, mais uma parcela fixa pela
+# geração do resumo e uma parcela bem menor pelo ranking extrativo. A soma
+# dos custos em execução fica abaixo de SUMMARIZER_ADMISSION_BUDGET; as
+# requisições excedentes esperam em uma fila limitada e, com a fila cheia,
+# são recusadas com 429
+ADMISSION_ENABLED = os.getenv("SUMMARIZER_ADMISSION", "1").lower() in ("1", "true", "yes")
+ADMISSION_BUDGET = float(os.getenv("SUMMARIZER_ADMISSION_BUDGET", "50000"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("SUMMARIZER_ADMISSION_QUEUE_SIZE", "32"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("SUMMARIZER_ADMISSION_QUEUE_TIMEOUT", "10"))  # Segundos
+
+EXTRACTIVE_COST_WEIGHT = 0.05  # Custo de um caractere no ranking LSA em relação à geração
+GENERATION_BASE_COST = 2000    # Custo fixo da geração de um resumo (decodificação do resumo)
+MAX_RETRY_AFTER = 60           # Segundos
+THROUGHPUT_WINDOW = 30.0       # Segundos de histórico usados para estimar a vazão
+
+
+def estimate_cost(text_length, method, num_beams=1, generation_chars=None):
+    """
+    Estima o custo de uma requisição de sumarização.
+
+    Args:
+        text_length (int): Comprimento do texto em caracteres
+        method (str): 'extractive', 'abstractive' ou 'hybrid'
+        num_beams (int): Feixes da decodificação (o custo da geração cresce com eles)
+        generation_chars (int): No método híbrido, caracteres que chegam ao modelo
+
+    Returns:
+        float: Custo em caracteres de geração
+    """
+    extractive_cost = text_length * EXTRACTIVE_COST_WEIGHT
+    if method == "extractive":
+        return extractive_cost
+    if method == "hybrid":
+        return extractive_cost + (min(text_length, generation_chars or text_length) + GENERATION_BASE_COST) * num_beams
+    return (text_length + GENERATION_BASE_COST) * num_beams
+
+
+class AdmissionRejected(Exception):
+    """Requisição recusada pelo controle de admissão."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limita o custo total das requisições em execução.
+
+    Uma requisição é admitida se o seu custo cabe no orçamento livre e não há
+    ninguém esperando; caso contrário entra em uma fila FIFO limitada (sem
+    ultrapassagens, para que requisições caras não fiquem esperando para
+    sempre). Com a fila cheia, ou após `queue_timeout` segundos na fila, a
+    requisição é recusada com uma estimativa de quando tentar de novo,
+    calculada pela vazão recente (custo concluído por segundo). Uma
+    requisição mais cara que o orçamento inteiro é executada sozinha.
+
+    Deve ser usado a partir de um único event loop.
+    """
+
+    def __init__(self, budget=ADMISSION_BUDGET, queue_size=ADMISSION_QUEUE_SIZE, queue_timeout=ADMISSION_QUEUE_TIMEOUT):
+        self.budget = budget
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._in_flight_cost = 0.0
+        self._in_flight = 0
+        self._waiters = deque()  # (custo, futuro)
+        self._completions = deque()  # (instante, custo) das requisições concluídas
+        self._admitted = 0
+        self._rejected = 0
+
+    @property
+    def queued_cost(self):
+        return sum(cost for cost, _future in self._waiters)
+
+    def _fits(self, cost):
+        return self._in_flight == 0 or self._in_flight_cost + cost <= self.budget
+
+    def throughput(self):
+        """Custo concluído por segundo na janela recente, ou None sem histórico."""
+        now = time.monotonic()
+        while self._completions and now - self._completions[0][0] > THROUGHPUT_WINDOW:
+            self._completions.popleft()
+        if not self._completions:
+            return None
+        elapsed = max(1.0, now - self._completions[0][0])
+        return sum(cost for _at, cost in self._completions) / elapsed
+
+    def retry_after(self, cost):
+        """Segundos estimados até haver orçamento para uma requisição de custo `cost`."""
+        backlog = self._in_flight_cost + self.queued_cost + min(cost, self.budget) - self.budget
+        throughput = self.throughput()
+        if backlog <= 0 or not throughput:
+            return 1
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(backlog / throughput)))
+
+    def _reject(self, reason, cost):
+        self._rejected += 1
+        retry_after = self.retry_after(cost)
+        logger.warning(f"Requisição recusada pelo controle de admissão ({reason}, custo {cost:.0f}); "
+                       f"nova tentativa em {retry_after} s")
+        raise AdmissionRejected(f"Servidor sobrecarregado ({reason}). Tente novamente em {retry_after} s.", retry_after)
+
+    async def acquire(self, cost):
+        """
+        Aguarda orçamento para executar uma requisição.
+
+        Raises:
+            AdmissionRejected: Com a fila cheia ou após o tempo máximo de espera
+        """
+        cost = min(cost, self.budget)
+        if not self._waiters and self._fits(cost):
+            self._admit(cost)
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._reject("fila de admissão cheia", cost)
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (cost, future)
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                self._waiters.remove(waiter)
+                self._wake_waiters()
+                self._reject("tempo de espera esgotado", cost)
+        except asyncio.CancelledError:
+            # Cliente desconectou: sai da fila ou devolve o orçamento já concedido
+            if future.done():
+                self.release(cost, completed=False)
+            else:
+                self._waiters.remove(waiter)
+                self._wake_waiters()
+            raise
+
+    def _admit(self, cost):
+        self._in_flight_cost += cost
+        self._in_flight += 1
+        self._admitted += 1
+
+    def release(self, cost, completed=True):
+        """Devolve o orçamento de uma requisição concluída e admite as próximas da fila."""
+        cost = min(cost, self.budget)
+        self._in_flight_cost -= cost
+        self._in_flight -= 1
+        if completed:
+            self._completions.append((time.monotonic(), cost))
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        while self._waiters and self._fits(self._waiters[0][0]):
+            cost, future = self._waiters.popleft()
+            if not future.done():
+                self._admit(cost)
+                future.set_result(None)
+
+    @asynccontextmanager
+    async def admit(self, cost):
+        """Contexto que mantém o orçamento reservado durante a execução da requisição."""
+        await self.acquire(cost)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    def stats(self):
+        """Métricas do controle de admissão."""
+        throughput = self.throughput()
+        return {
+            "budget": self.budget,
+            "in_flight": self._in_flight,
+            "in_flight_cost": self._in_flight_cost,
+            "queued": len(self._waiters),
+            "queued_cost": self.queued_cost,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "throughput": throughput,
+        }
@@ -0,0 +1,161 @@
+# batching.py
+import logging
+import queue
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class _BatchItem:
+    """Texto aguardando na fila do agendador, com o futuro do seu resultado."""
+
+    __slots__ = ("text", "key", "future", "enqueued_at")
+
+    def __init__(self, text, key):
+        self.text = text
+        self.key = key
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatchScheduler:
+    """
+    Agrupa textos de requisições concorrentes em lotes para o modelo.
+
+    Cada texto enviado espera no máximo `max_wait_ms` milissegundos (ou até o
+    lote atingir `max_batch_size`) antes de ser processado junto com os
+    demais. Só entram no mesmo lote textos com a mesma chave, isto é, com os
+    mesmos parâmetros de geração. O modelo é chamado apenas pela thread do
+    agendador.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=10, history_size=1000):
+        """
+        Args:
+            run_batch (callable): Função `run_batch(texts, key)` que devolve um resultado por texto
+            max_batch_size (int): Número máximo de textos por lote
+            max_wait_ms (float): Tempo máximo que um texto espera por companheiros de lote
+            history_size (int): Quantidade de medições recentes guardadas para as métricas
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._run_batch = run_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+        # Métricas
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes = Counter()
+        self._queue_times = deque(maxlen=history_size)
+
+    def submit(self, text, key):
+        """
+        Coloca um texto na fila do agendador.
+
+        Returns:
+            concurrent.futures.Future: Futuro com o resultado do texto
+        """
+        self._ensure_started()
+        item = _BatchItem(text, key)
+        self._queue.put(item)
+        return item.future
+
+    def run(self, texts, key):
+        """Envia vários textos e aguarda todos os resultados, na ordem de entrada."""
+        futures = [self.submit(text, key) for text in texts]
+        return [future.result() for future in futures]
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._stopping = False
+                    self._thread = threading.Thread(target=self._loop, name="microbatch-scheduler", daemon=True)
+                    self._thread.start()
+
+    def shutdown(self):
+        """Interrompe a thread do agendador depois de processar o que estiver na fila."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stopping = True
+        self._queue.put(None)
+        thread.join()
+
+    def _loop(self):
+        pending = {}  # chave -> itens aguardando, em ordem de chegada
+        while True:
+            if pending:
+                oldest = min(items[0].enqueued_at for items in pending.values())
+                timeout = max(0.0, oldest + self.max_wait - time.perf_counter())
+            else:
+                timeout = None
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                pending.setdefault(item.key, []).append(item)
+            elif self._stopping and self._queue.empty():
+                for key in list(pending):
+                    self._flush(pending.pop(key))
+                return
+
+            now = time.perf_counter()
+            for key in list(pending):
+                items = pending[key]
+                while len(items) >= self.max_batch_size:
+                    self._flush(items[:self.max_batch_size])
+                    items = pending[key] = items[self.max_batch_size:]
+                if items and now - items[0].enqueued_at >= self.max_wait:
+                    self._flush(items)
+                    items = []
+                if not items:
+                    del pending[key]
+
+    def _flush(self, items):
+        """Executa um lote e entrega o resultado (ou a exceção) a cada item."""
+        started_at = time.perf_counter()
+        with self._lock:
+            self._batches += 1
+            self._items += len(items)
+            self._batch_sizes[len(items)] += 1
+            self._queue_times.extend(started_at - item.enqueued_at for item in items)
+
+        try:
+            results = self._run_batch([item.text for item in items], items[0].key)
+        except Exception as e:
+            logger.error(f"Erro ao processar lote de {len(items)} textos: {str(e)}")
+            for item in items:
+                item.future.set_exception(e)
+            return
+
+        for item, result in zip(items, results):
+            item.future.set_result(result)
+
+    def stats(self):
+        """Métricas de tamanho de lote e tempo de fila (em milissegundos)."""
+        with self._lock:
+            queue_times = sorted(t * 1000 for t in self._queue_times)
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "queue_depth": self._queue.qsize(),
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+                "queue_time_ms": {
+                    "p50": statistics.median(queue_times) if queue_times else 0.0,
+                    "p95": queue_times[min(len(queue_times) - 1, int(len(queue_times) * 0.95))] if queue_times else 0.0,
+                    "max": queue_times[-1] if queue_times else 0.0,
+                },
+            }
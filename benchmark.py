@@ -0,0 +1,945 @@
+# benchmark.py
+"""
+Benchmarks de desempenho da API de sumarização.
+
+Uso:
+    python benchmark.py <cenário> [opções]
+
+Cenários disponíveis:
+    extractive-setup   Custo de inicialização dos recursos do sumy por requisição
+    extractive-engines Latência e pico de memória dos motores 'sumy' e 'sparse'
+    extractive-budget  Seleção de sentenças por orçamento (mochila) em documentos grandes
+    health-under-load  Latência de /health enquanto sumarizações longas estão em execução
+    cold-start         Tempo de importação e de warm-up em processos novos
+    abstractive-batch  Ganho da geração em lotes no caminho de textos longos
+    hierarchical-reduce Escala da redução hierárquica em documentos de 100k+ tokens
+    hybrid             Latência e qualidade do método híbrido contra o abstrativo por chunks
+    stream-ttft        Tempo até o primeiro evento do streaming SSE contra o tempo total
+    length-planning    Tokens decodificados por requisição com e sem o planejamento de comprimento
+    chunk-allocation   Frequência do resumo final com orçamento uniforme ou proporcional entre chunks
+    microbatch-load    Carga de requisições abstrativas curtas com e sem micro-batching
+    batch-endpoint     Throughput de N chamadas a /summarize contra chamadas a /summarize/batch
+    admission-overload Latência (p99) e rejeições sob sobrecarga com e sem o controle de admissão
+    chunker            Chunking do caminho abstrativo em entradas de ~1 MB
+    decoding-profiles  Latência e qualidade (ROUGE) dos perfis de decodificação
+    abstractive-engines Latência, throughput e memória dos motores 'torch' e 'onnx'
+    quantization       Memória, latência e desvio de ROUGE do modelo int8 em relação ao fp32
+    vocab-pruning      Memória, tempo por token e desvio do modelo com vocabulário reduzido
+    speculative-decoding Taxa de aceitação e latência da geração assistida por um modelo de rascunho
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import glob
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Vocabulário usado para gerar textos sintéticos em português
+_SUBJECTS = [
+    "O governo", "A empresa", "O pesquisador", "A universidade", "O mercado",
+    "A população", "O tribunal", "A prefeitura", "O hospital", "A equipe",
+]
+_VERBS = [
+    "anunciou", "investigou", "aprovou", "criticou", "apresentou",
+    "divulgou", "ampliou", "reduziu", "defendeu", "analisou",
+]
+_OBJECTS = [
+    "um novo plano de investimentos", "os resultados do último trimestre",
+    "a proposta de reforma tributária", "um estudo sobre mudanças climáticas",
+    "as metas de vacinação", "o orçamento da educação", "a política de transporte público",
+    "um acordo comercial internacional", "os dados de desemprego", "a expansão da rede elétrica",
+]
+_COMPLEMENTS = [
+    "nesta segunda-feira", "após meses de negociação", "durante uma coletiva de imprensa",
+    "em meio a críticas da oposição", "segundo especialistas ouvidos pela reportagem",
+    "com apoio de entidades civis", "apesar das incertezas econômicas", "em todo o país",
+]
+
+_SYLLABLES = ["ba", "ca", "da", "fe", "go", "lu", "ma", "ni", "po", "ra", "se", "ti", "vo", "xu", "zé"]
+
+
+def _place_name(rng):
+    """Gera um nome de localidade fictício, aumentando o vocabulário do texto."""
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def sample_text(n_sentences, seed=42):
+    """Gera um texto sintético em português com `n_sentences` sentenças."""
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(n_sentences):
+        sentences.append(
+            f"{rng.choice(_SUBJECTS)} de {_place_name(rng)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} "
+            f"{rng.choice(_COMPLEMENTS)}."
+        )
+    return " ".join(sentences)
+
+
+def sample_text_of_size(size_kb, seed=42):
+    """Gera um texto sintético com aproximadamente `size_kb` kilobytes."""
+    text = sample_text(max(1, size_kb * 1024 // 60), seed)
+    return text[:size_kb * 1024].rsplit(". ", 1)[0] + "."
+
+
+def load_corpus(directory, limit=None):
+    """
+    Carrega um corpus local de textos em português.
+
+    Cada artigo é um arquivo `nome.txt`; se existir `nome.ref.txt`, ele é usado
+    como resumo de referência para as métricas de qualidade.
+
+    Returns:
+        list[tuple[str, str | None]]: Pares (texto, referência)
+    """
+    documents = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+        if path.endswith(".ref.txt"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        reference_path = path[:-len(".txt")] + ".ref.txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                reference = f.read().strip()
+        documents.append((text, reference))
+    return documents[:limit] if limit else documents
+
+
+def _words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def rouge_n(candidate, reference, n=1):
+    """F1 do ROUGE-N entre dois textos."""
+    def ngrams(words):
+        return collections.Counter(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+
+    candidate_ngrams, reference_ngrams = ngrams(_words(candidate)), ngrams(_words(reference))
+    overlap = sum((candidate_ngrams & reference_ngrams).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(candidate_ngrams.values())
+    recall = overlap / sum(reference_ngrams.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_l(candidate, reference):
+    """F1 do ROUGE-L (maior subsequência comum) entre dois textos."""
+    a, b = _words(candidate), _words(reference)
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for word in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if word == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def measure(func, iterations):
+    """Executa `func` várias vezes e retorna as latências em milissegundos."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    """Imprime p50, média e p95 de uma lista de latências em milissegundos."""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<45} p50={statistics.median(ordered):9.2f} ms  "
+          f"média={statistics.mean(ordered):9.2f} ms  p95={p95:9.2f} ms")
+
+
+def bench_extractive_setup(args):
+    """Compara a construção dos recursos do sumy por requisição com o registro compartilhado."""
+    import summarizer
+    from sumy.parsers.plaintext import PlaintextParser
+
+    text = sample_text(args.sentences)
+
+    def per_request():
+        # Comportamento antigo: todos os objetos eram recriados a cada chamada
+        resources = summarizer.ExtractiveResources(summarizer.LANGUAGE)
+        parser = PlaintextParser.from_string(text, resources.tokenizer)
+        tuple(resources.summarizer(parser.document, summarizer.DEFAULT_SENTENCES_COUNT))
+
+    def cached():
+        summarizer.summarize_extractive(text)
+
+    summarizer.get_extractive_resources()
+    report("setup isolado (ExtractiveResources)", measure(lambda: summarizer.ExtractiveResources(summarizer.LANGUAGE), args.iterations))
+    report("requisição com setup por chamada", measure(per_request, args.iterations))
+    report("requisição com registro compartilhado", measure(cached, args.iterations))
+
+
+def bench_extractive_engines(args):
+    """Mede latência e pico de memória do ranking LSA conforme o documento cresce."""
+    import summarizer
+
+    summarizer.get_extractive_resources()
+    for size_kb in args.sizes:
+        text = sample_text_of_size(size_kb)
+        for engine in summarizer.EXTRACTIVE_ENGINES:
+            tracemalloc.start()
+            start = time.perf_counter()
+            ranked = summarizer.rank_sentences(text, engine=engine)
+            elapsed = time.perf_counter() - start
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{size_kb:>5} KB  {len(ranked):>6} sentenças  engine={engine:<7} "
+                  f"latência={elapsed * 1000:10.1f} ms  pico de memória={peak / 2**20:8.1f} MiB")
+
+
+def bench_extractive_budget(args):
+    """Mede a seleção por orçamento de caracteres em documentos com milhares de sentenças."""
+    import summarizer
+
+    summarizer.get_extractive_resources()
+    for n_sentences in args.sentence_counts:
+        text = sample_text(n_sentences)
+        ranked = summarizer.rank_sentences(text, engine="sparse")
+        for max_length in (150, 500, 1000):
+            min_length = max_length // 5
+            timings = measure(lambda: summarizer.select_sentences_within_budget(ranked, max_length, min_length), args.iterations)
+            selected = summarizer.select_sentences_within_budget(ranked, max_length, min_length)
+            length = len(" ".join(s.text for s in selected))
+            report(f"{n_sentences} sentenças, max_length={max_length} ({len(selected)} sel., {length} car.)", timings)
+        report(f"{n_sentences} sentenças, summarize_extractive completo",
+               measure(lambda: summarizer.summarize_extractive(text, 500, 100, engine="sparse"), max(1, args.iterations // 10)))
+
+
+def bench_health_under_load(args):
+    """Verifica que /health continua respondendo rápido durante sumarizações longas."""
+    import httpx
+    import main
+
+    payload = {
+        "text": sample_text_of_size(args.load_kb),
+        "method": args.method,
+        "max_length": 500,
+        "min_length": 100,
+    }
+
+    async def poll_health(client, stop):
+        timings = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            timings.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.05)
+        return timings
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            stop = asyncio.Event()
+            idle = asyncio.create_task(poll_health(client, stop))
+            await asyncio.sleep(2)
+            stop.set()
+            report("/health sem carga", await idle)
+
+            stop = asyncio.Event()
+            loaded = asyncio.create_task(poll_health(client, stop))
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/summarize", json=payload) for _ in range(args.concurrency)
+            ])
+            elapsed = time.perf_counter() - start
+            stop.set()
+            report(f"/health com {args.concurrency} sumarizações '{args.method}'", await loaded)
+            statuses = collections.Counter(response.status_code for response in responses)
+            print(f"Sumarizações concluídas em {elapsed:.1f} s, status: {dict(statuses)}")
+
+    asyncio.run(run())
+
+
+def bench_cold_start(args):
+    """Mede, em processos Python novos, o tempo até cada etapa de inicialização ficar pronta."""
+    steps = [
+        ("import summarizer (carregamento sob demanda)", "import summarizer"),
+        ("import + warm-up extrativo", "import summarizer; summarizer.warm_up(abstractive=False)"),
+        # Equivalente ao comportamento antigo, que carregava tudo na importação
+        ("import + warm-up completo (comportamento antigo)", "import summarizer; summarizer.warm_up()"),
+    ]
+    for label, code in steps:
+        timings = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True, capture_output=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+            timings.append((time.perf_counter() - start) * 1000)
+        report(label, timings)
+
+
+def sample_text_of_tokens(n_tokens, tokenizer, seed=42):
+    """Gera um texto sintético com aproximadamente `n_tokens` tokens do modelo."""
+    n_sentences = max(1, n_tokens // 20)
+    while True:
+        text = sample_text(n_sentences, seed)
+        count = len(tokenizer.encode(text, add_special_tokens=False))
+        if count >= n_tokens:
+            return text, count
+        n_sentences = int(n_sentences * n_tokens / count) + 1
+
+
+def bench_abstractive_batch(args):
+    """
+    Compara o tempo total e tokens/s do caminho longo com diferentes tamanhos de lote.
+
+    O micro-batching é desligado durante a medição, para que cada chamada ao
+    modelo leve exatamente os chunks de um lote de `batch_size`.
+    """
+    import summarizer
+
+    tokenizer = summarizer.get_abstractive_pipeline().tokenizer
+    microbatch_enabled, batch_size_default = summarizer.MICROBATCH_ENABLED, summarizer.ABSTRACTIVE_BATCH_SIZE
+    summarizer.MICROBATCH_ENABLED = False
+    try:
+        for n_tokens in args.token_sizes:
+            text, count = sample_text_of_tokens(n_tokens, tokenizer)
+            for batch_size in args.batch_sizes:
+                summarizer.ABSTRACTIVE_BATCH_SIZE = batch_size
+                start = time.perf_counter()
+                summarizer.summarize_abstractive(text, 200, 50)
+                elapsed = time.perf_counter() - start
+                print(f"{count:>7} tokens  batch_size={batch_size:<3} tempo={elapsed:8.1f} s  "
+                      f"throughput={count / elapsed:9.1f} tokens/s")
+    finally:
+        summarizer.MICROBATCH_ENABLED, summarizer.ABSTRACTIVE_BATCH_SIZE = microbatch_enabled, batch_size_default
+
+
+@contextlib.contextmanager
+def counting_generate_calls():
+    """Conta os textos enviados em cada chamada de geração do summarizer."""
+    import summarizer
+
+    generate_summaries = summarizer._generate_summaries
+    calls = []
+
+    def counting_generate(texts, generation, batch_size=None):
+        calls.append(len(texts))
+        return generate_summaries(texts, generation, batch_size)
+
+    summarizer._generate_summaries = counting_generate
+    try:
+        yield calls
+    finally:
+        summarizer._generate_summaries = generate_summaries
+
+
+def bench_hierarchical_reduce(args):
+    """Mede como o tempo total da redução hierárquica escala com o tamanho do documento."""
+    import summarizer
+
+    tokenizer = summarizer.get_abstractive_pipeline().tokenizer
+    for n_tokens in args.token_sizes:
+        text, count = sample_text_of_tokens(n_tokens, tokenizer)
+        with counting_generate_calls() as calls:
+            start = time.perf_counter()
+            summarizer.summarize_abstractive(text, 200, 50, decoding="greedy")
+            elapsed = time.perf_counter() - start
+        # A primeira chamada resume os chunks; as demais são os níveis de redução
+        print(f"{count:>7} tokens  tempo={elapsed:8.1f} s  chunks={calls[0]:<5} "
+              f"textos por nível={calls[1:]}  tokens/s={count / elapsed:9.1f}")
+
+
+def bench_hybrid(args):
+    """Compara o método híbrido (pré-seleção extrativa) com o abstrativo por chunks."""
+    import summarizer
+
+    tokenizer = summarizer.get_abstractive_pipeline().tokenizer
+    if args.corpus:
+        documents = load_corpus(args.corpus, args.limit)
+    else:
+        documents = [(sample_text_of_tokens(n_tokens, tokenizer)[0], None) for n_tokens in args.token_sizes]
+
+    methods = (("abstractive", summarizer.summarize_abstractive), ("hybrid", summarizer.summarize_hybrid))
+    summaries = {name: [] for name, _func in methods}
+    for text, reference in documents:
+        count = len(tokenizer.encode(text, add_special_tokens=False))
+        for name, func in methods:
+            with counting_generate_calls() as calls:
+                start = time.perf_counter()
+                summary = func(text, 200, 50, decoding="greedy")
+                elapsed = time.perf_counter() - start
+            summaries[name].append(summary)
+            quality = f"  ROUGE-1={rouge_n(summary, reference, 1):.3f} ROUGE-L={rouge_l(summary, reference):.3f}" if reference else ""
+            print(f"{count:>7} tokens  {name:<12} tempo={elapsed:8.1f} s  "
+                  f"textos gerados={sum(calls):<5} chamadas={len(calls)}{quality}")
+
+    _report_drift("hybrid vs abstractive", summaries["abstractive"], summaries["hybrid"])
+
+
+def bench_stream_ttft(args):
+    """Tempo até o primeiro evento do streaming comparado ao tempo total da geração."""
+    import summarizer
+
+    tokenizer = summarizer.get_abstractive_pipeline().tokenizer
+    for n_tokens in [300] + args.token_sizes:
+        text, count = sample_text_of_tokens(n_tokens, tokenizer)
+        for profile in ("greedy", "beam"):
+            events = list(summarizer.stream_abstractive(text, 200, 50, decoding=profile))
+            final = events[-1]
+            print(f"{count:>7} tokens  perfil={profile:<7} eventos={len(events) - 1:<5} "
+                  f"TTFT={final['ttft_ms']:9.1f} ms  total={final['total_ms']:9.1f} ms")
+
+
+def bench_length_planning(args):
+    """Tokens decodificados por requisição: limites em caracteres tratados como tokens contra o planejamento."""
+    import summarizer
+
+    texts = [text for text, _reference in _benchmark_documents(args)]
+    run_generation = summarizer._run_generation
+    decoded = []
+
+    def counting_run_generation(texts, generation):
+        outputs = run_generation(texts, generation)
+        decoded.extend(count for _summary, count in outputs)
+        return outputs
+
+    summarizer._run_generation = counting_run_generation
+    try:
+        for max_length in args.lengths:
+            min_length = max(10, max_length // 5)
+            decoding = summarizer.resolve_decoding("beam")
+            for label in ("caracteres como tokens", "planejado"):
+                decoded.clear()
+                lengths, timings = [], []
+                for text in texts:
+                    start = time.perf_counter()
+                    if label == "planejado":
+                        summary = summarizer.summarize_abstractive(text, max_length, min_length, decoding="beam")
+                    else:
+                        # Comportamento anterior: o orçamento em caracteres ia
+                        # direto para o generate e o texto era cortado depois
+                        summary = summarizer._generate_summaries([text], dict(
+                            decoding, max_new_tokens=max_length, min_new_tokens=min_length))[0]
+                        if len(summary) > max_length * 2:
+                            summary = summary[:max_length * 2].rsplit(' ', 1)[0] + "..."
+                    timings.append((time.perf_counter() - start) * 1000)
+                    lengths.append(len(summary))
+                print(f"max_length={max_length:<5} {label:<24} tokens decodificados/req={statistics.mean(decoded):7.1f}  "
+                      f"caracteres={statistics.mean(lengths):7.1f}  tempo médio={statistics.mean(timings):8.1f} ms")
+    finally:
+        summarizer._run_generation = run_generation
+
+
+def bench_chunk_allocation(args):
+    """Com que frequência o resumo final (ou a redução) é necessário com cada distribuição de orçamento entre chunks."""
+    import summarizer
+
+    tokenizer = summarizer.get_abstractive_pipeline().tokenizer
+    if args.corpus:
+        texts = [text for text, _reference in load_corpus(args.corpus, args.limit)]
+    else:
+        texts = [sample_text_of_tokens(n_tokens, tokenizer, seed)[0]
+                 for n_tokens in args.token_sizes for seed in range(args.limit or 5)]
+
+    reduce_summaries = summarizer._reduce_summaries
+    reduce_calls = []
+
+    def counting_reduce(*reduce_args, **reduce_kwargs):
+        with counting_generate_calls() as calls:
+            result = reduce_summaries(*reduce_args, **reduce_kwargs)
+        reduce_calls.append(len(calls))
+        return result
+
+    summarizer._reduce_summaries = counting_reduce
+    try:
+        for mode in summarizer.CHUNK_BUDGET_MODES:
+            summarizer.CHUNK_BUDGET_MODE = mode
+            reduce_calls.clear()
+            timings, lengths = [], []
+            for text in texts:
+                start = time.perf_counter()
+                lengths.append(len(summarizer.summarize_abstractive(text, args.max_length, args.max_length // 5, decoding="greedy")))
+                timings.append((time.perf_counter() - start) * 1000)
+            long_texts = len(reduce_calls)
+            with_final = sum(1 for calls in reduce_calls if calls)
+            print(f"{mode:<13} textos longos={long_texts:<4} com resumo final/redução={with_final:<4} "
+                  f"({with_final / max(1, long_texts):.0%})  chamadas extras={sum(reduce_calls):<4} "
+                  f"tempo médio={statistics.mean(timings):8.1f} ms  caracteres={statistics.mean(lengths):6.1f}")
+    finally:
+        summarizer._reduce_summaries = reduce_summaries
+
+
+def bench_microbatch_load(args):
+    """Dispara requisições abstrativas curtas concorrentes com e sem o agendador de micro-lotes."""
+    import summarizer
+
+    summarizer.get_abstractive_pipeline()
+    texts = [sample_text(5, seed) for seed in range(args.requests)]
+
+    def timed_request(text):
+        start = time.perf_counter()
+        summarizer.summarize_abstractive(text, 60, 20)
+        return (time.perf_counter() - start) * 1000
+
+    for enabled in (False, True):
+        summarizer.MICROBATCH_ENABLED = enabled
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = list(pool.map(timed_request, texts))
+        elapsed = time.perf_counter() - start
+        label = "com micro-batching" if enabled else "sem micro-batching"
+        report(f"{label} ({args.requests / elapsed:.2f} req/s)", latencies)
+
+    stats = summarizer.get_batch_scheduler().stats()
+    print(f"Lotes: {stats['batches']}, tamanho médio: {stats['avg_batch_size']:.2f}, "
+          f"distribuição: {stats['batch_sizes']}, tempo de fila: {stats['queue_time_ms']}")
+    summarizer.get_batch_scheduler().shutdown()
+
+
+def bench_batch_endpoint(args):
+    """Compara N chamadas individuais a /summarize com o mesmo trabalho enviado a /summarize/batch."""
+    import httpx
+    import main
+
+    # Sem cache, para que as duas formas façam o mesmo trabalho
+    main.summary_cache = None
+    items = [{"text": sample_text(5, seed), "method": args.method, "max_length": 150, "min_length": 30,
+              "decoding": "greedy"} for seed in range(args.requests)]
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            # Aquecimento dos pools e dos modelos
+            await client.post("/summarize/batch", json={"items": items[:2]})
+
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def single(item):
+                async with semaphore:
+                    return await client.post("/summarize", json=item)
+
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[single(item) for item in items])
+            elapsed = time.perf_counter() - start
+            statuses = collections.Counter(response.status_code for response in responses)
+            print(f"{len(items)} chamadas a /summarize ({args.concurrency} simultâneas): {elapsed:.2f} s, "
+                  f"{len(items) / elapsed:.1f} itens/s, status: {dict(statuses)}")
+
+            start = time.perf_counter()
+            statuses = collections.Counter()
+            for offset in range(0, len(items), main.BATCH_MAX_ITEMS):
+                response = await client.post("/summarize/batch", json={"items": items[offset:offset + main.BATCH_MAX_ITEMS]})
+                statuses.update(result["status"] for result in response.json()["results"])
+            elapsed = time.perf_counter() - start
+            calls = -(-len(items) // main.BATCH_MAX_ITEMS)
+            print(f"{calls} chamada(s) a /summarize/batch: {elapsed:.2f} s, "
+                  f"{len(items) / elapsed:.1f} itens/s, itens: {dict(statuses)}")
+
+    asyncio.run(run())
+    main.extractive_executor.shutdown()
+    main.abstractive_executor.shutdown()
+
+
+def bench_admission_overload(args):
+    """
+    Carga em malha aberta acima da capacidade, com e sem o controle de admissão.
+
+    As requisições chegam a uma taxa fixa (--rate), independentemente das
+    respostas, com textos de tamanhos variados. Sem admissão, as requisições
+    se acumulam na fila dos pools; com admissão, o excesso é recusado cedo
+    com 429 e a latência das aceitas fica limitada.
+    """
+    import httpx
+    import admission
+    import main
+
+    main.summary_cache = None
+    rng = random.Random(42)
+    payloads = [{"text": sample_text(rng.choice((5, 20, 80)), seed), "method": args.method, "max_length": 150,
+                 "min_length": 30, "decoding": "greedy"} for seed in range(args.requests)]
+
+    async def run(controller):
+        main.admission_controller = controller
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            await client.post("/summarize", json=payloads[0])
+
+            async def timed(payload, delay):
+                await asyncio.sleep(delay)
+                start = time.perf_counter()
+                response = await client.post("/summarize", json=payload)
+                return response, (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*[timed(payload, i / args.rate) for i, payload in enumerate(payloads)])
+            elapsed = time.perf_counter() - start
+
+        label = "com admissão" if controller is not None else "sem admissão"
+        statuses = collections.Counter(response.status_code for response, _ms in results)
+        accepted = [ms for response, ms in results if response.status_code == 200]
+        retry_after = [int(response.headers["Retry-After"]) for response, _ms in results if response.status_code == 429]
+        if accepted:
+            p99 = sorted(accepted)[min(len(accepted) - 1, int(len(accepted) * 0.99))]
+            report(f"{label} (p99={p99:.0f} ms)", accepted)
+        print(f"    {len(results)} requisições em {elapsed:.1f} s, status: {dict(statuses)}"
+              + (f", Retry-After médio: {statistics.mean(retry_after):.1f} s" if retry_after else ""))
+
+    asyncio.run(run(None))
+    asyncio.run(run(admission.AdmissionController(
+        budget=args.admission_budget, queue_size=args.admission_queue, queue_timeout=args.queue_timeout)))
+    main.extractive_executor.shutdown()
+    main.abstractive_executor.shutdown()
+
+
+def bench_metrics_overhead(args):
+    """Mede o custo da instrumentação e mostra a divisão do tempo por etapa em /metrics."""
+    import metrics
+    import summarizer
+
+    summarizer.get_extractive_resources()
+    summarizer.get_abstractive_pipeline()
+    extractive_text = sample_text(args.sentences)
+    abstractive_text = sample_text(5)
+
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        label = "com métricas" if enabled else "sem métricas"
+        report(f"extrativo {label}", measure(lambda: summarizer.summarize_extractive(extractive_text), args.iterations))
+        report(f"abstrativo curto {label}", measure(
+            lambda: summarizer.summarize_abstractive(abstractive_text, 60, 20, "greedy"), max(1, args.iterations // 10)))
+
+    for n_tokens in args.token_sizes:
+        text, _count = sample_text_of_tokens(n_tokens, summarizer.get_abstractive_pipeline().tokenizer)
+        summarizer.summarize_abstractive(text, args.max_length, args.max_length // 4, "greedy")
+
+    # Médias por etapa a partir do próprio texto de /metrics
+    totals = {}
+    for line in metrics.render_metrics().splitlines():
+        match = re.match(r'summarizer_stage_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)', line)
+        if match:
+            totals.setdefault(match.group(2), {})[match.group(1)] = float(match.group(3))
+    for stage, values in sorted(totals.items()):
+        print(f"{stage:<20} n={values['count']:6.0f}  média={values['sum'] / values['count'] * 1000:10.2f} ms  "
+              f"total={values['sum']:8.2f} s")
+    summarizer.get_batch_scheduler().shutdown()
+
+
+def _legacy_chunks(text, tokenizer, max_chunk_tokens):
+    """Chunking anterior: texto inteiro codificado e cada sentença recodificada."""
+    tokenizer.encode(text, add_special_tokens=True)
+    chunks = []
+    current_chunk_text = ""
+    current_length = 0
+    for sentence in text.split('. '):
+        sentence_tokens = tokenizer.encode(sentence + ". ", add_special_tokens=False)
+        if current_length + len(sentence_tokens) <= max_chunk_tokens:
+            current_chunk_text += sentence + ". "
+            current_length += len(sentence_tokens)
+        else:
+            if current_chunk_text:
+                chunks.append(current_chunk_text.strip())
+            current_chunk_text = sentence + ". "
+            current_length = len(sentence_tokens)
+    if current_chunk_text:
+        chunks.append(current_chunk_text.strip())
+    return chunks
+
+
+def bench_chunker(args):
+    """Compara o chunking com tokenização única (offsets) com o chunking anterior."""
+    import summarizer
+
+    tokenizer = summarizer.get_abstractive_pipeline().tokenizer
+    text = sample_text_of_size(args.chunker_kb)
+
+    def single_pass():
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        return summarizer.split_into_chunks(text, offsets, 462)
+
+    print(f"Entrada: {len(text) / 1024:.0f} KB, {len(single_pass())} chunks")
+    report("chunking anterior (2-3 tokenizações)", measure(lambda: _legacy_chunks(text, tokenizer, 462), args.iterations))
+    report("tokenização única com offsets", measure(single_pass, args.iterations))
+
+
+def bench_decoding_profiles(args):
+    """Compara latência, reprodutibilidade e ROUGE dos perfis de decodificação."""
+    import summarizer
+
+    if args.corpus:
+        documents = load_corpus(args.corpus, args.limit)
+    else:
+        logging.warning("Nenhum corpus informado (--corpus); usando textos sintéticos sem referência")
+        documents = [(sample_text(8, seed), None) for seed in range(args.limit or 10)]
+
+    summarizer.get_abstractive_pipeline()
+    for profile in summarizer.DECODING_PROFILES:
+        timings, rouge1, rougeL, stable = [], [], [], 0
+        for text, reference in documents:
+            start = time.perf_counter()
+            summary = summarizer.summarize_abstractive(text, 150, 30, decoding=profile)
+            timings.append((time.perf_counter() - start) * 1000)
+            if summarizer.summarize_abstractive(text, 150, 30, decoding=profile) == summary:
+                stable += 1
+            if reference:
+                rouge1.append(rouge_n(summary, reference, 1))
+                rougeL.append(rouge_l(summary, reference))
+        report(f"perfil {profile}", timings)
+        quality = (f"ROUGE-1={statistics.mean(rouge1):.3f} ROUGE-L={statistics.mean(rougeL):.3f}"
+                   if rouge1 else "sem referências")
+        print(f"    reprodutível em {stable}/{len(documents)} documentos, {quality}")
+
+
+# Executado em um processo novo por configuração, para que o pico de RSS de
+# uma não contamine a medição da outra
+_MODEL_PROBE = """
+import json, resource, sys, time
+import torch
+import summarizer
+texts = json.loads(sys.stdin.read())
+start = time.perf_counter()
+pipe = summarizer.get_abstractive_pipeline()
+load = time.perf_counter() - start
+latencies, summaries = [], []
+for text in texts:
+    start = time.perf_counter()
+    summaries.append(summarizer.summarize_abstractive(text, 150, 30, decoding="greedy"))
+    latencies.append((time.perf_counter() - start) * 1000)
+start = time.perf_counter()
+summarizer._generate_summaries(["summarize: " + text for text in texts], dict(
+    summarizer.resolve_decoding("greedy"), max_length=150, min_length=30), batch_size=len(texts))
+throughput = len(texts) / (time.perf_counter() - start)
+parameters_mb = (sum(p.numel() * p.element_size() for p in pipe.model.parameters()) / 2**20
+                 if isinstance(pipe.model, torch.nn.Module) else None)
+print(json.dumps({"load_s": load, "latencies": latencies, "throughput": throughput, "summaries": summaries,
+                  "summary_tokens": sum(len(pipe.tokenizer.encode(s, add_special_tokens=False)) for s in summaries),
+                  "parameters_mb": parameters_mb,
+                  "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def _probe_model(texts, **env):
+    """Roda `_MODEL_PROBE` em um processo novo com as variáveis de ambiente dadas."""
+    result = subprocess.run(
+        [sys.executable, "-c", _MODEL_PROBE], input=json.dumps(texts), check=True, capture_output=True,
+        text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, SUMMARIZER_MICROBATCH="0", **env),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _report_probe(label, metrics):
+    report(label, metrics["latencies"])
+    print(f"    carga={metrics['load_s']:.1f} s  throughput={metrics['throughput']:.2f} textos/s  "
+          f"RSS máximo={metrics['max_rss_mb']:.0f} MB")
+
+
+def _benchmark_documents(args, default_count=8):
+    """Documentos do corpus local (--corpus) ou, na falta dele, textos sintéticos sem referência."""
+    if args.corpus:
+        return load_corpus(args.corpus, args.limit)
+    return [(sample_text(8, seed), None) for seed in range(args.limit or default_count)]
+
+
+def bench_abstractive_engines(args):
+    """Compara os motores de inferência abstrativa, cada um em um processo novo."""
+    texts = [text for text, _reference in _benchmark_documents(args)]
+    for engine in args.engines:
+        _report_probe(f"motor {engine}", _probe_model(texts, SUMMARIZER_ABSTRACTIVE_ENGINE=engine))
+
+
+def bench_quantization(args):
+    """Compara memória, latência e qualidade do modelo fp32 com o quantizado em int8."""
+    documents = _benchmark_documents(args)
+    texts = [text for text, _reference in documents]
+    results = {}
+    for precision in ("fp32", "int8"):
+        results[precision] = _probe_model(texts, SUMMARIZER_ABSTRACTIVE_ENGINE="torch",
+                                          SUMMARIZER_MODEL_PRECISION=precision)
+        _report_probe(f"precisão {precision}", results[precision])
+
+    _report_drift("int8 vs fp32", results["fp32"]["summaries"], results["int8"]["summaries"])
+    for precision, metrics in results.items():
+        _report_reference_rouge(precision, metrics["summaries"], documents)
+
+
+def _report_drift(label, baseline, candidate):
+    """Quanto os resumos de uma variante do modelo se afastam dos do modelo original."""
+    pairs = list(zip(baseline, candidate))
+    identical = sum(a == b for a, b in pairs)
+    print(f"{label}: {identical}/{len(pairs)} resumos idênticos, "
+          f"ROUGE-1={statistics.mean(rouge_n(b, a, 1) for a, b in pairs):.3f} "
+          f"ROUGE-L={statistics.mean(rouge_l(b, a) for a, b in pairs):.3f}")
+
+
+def _report_reference_rouge(label, summaries, documents):
+    scored = [(summary, reference) for summary, (_text, reference) in zip(summaries, documents) if reference]
+    if scored:
+        print(f"{label} vs referências: "
+              f"ROUGE-1={statistics.mean(rouge_n(s, r, 1) for s, r in scored):.3f} "
+              f"ROUGE-L={statistics.mean(rouge_l(s, r) for s, r in scored):.3f}")
+
+
+def bench_vocab_pruning(args):
+    """Compara o modelo original com o de vocabulário reduzido (prepare_models.py prune-vocab)."""
+    documents = _benchmark_documents(args)
+    texts = [text for text, _reference in documents]
+    results = {}
+    for label, env in (("original", {}), ("vocabulário reduzido", {"SUMMARIZER_MODEL_DIR": args.pruned_dir})):
+        results[label] = metrics = _probe_model(
+            texts, SUMMARIZER_ABSTRACTIVE_ENGINE="torch", SUMMARIZER_MODEL_PRECISION="fp32", **env)
+        _report_probe(label, metrics)
+        print(f"    parâmetros={metrics['parameters_mb']:.1f} MB  "
+              f"tempo por token gerado={sum(metrics['latencies']) / max(1, metrics['summary_tokens']):.2f} ms")
+        _report_reference_rouge(label, metrics["summaries"], documents)
+
+    _report_drift("reduzido vs original", results["original"]["summaries"], results["vocabulário reduzido"]["summaries"])
+
+
+@contextlib.contextmanager
+def counting_forward_calls(model):
+    """Conta as passadas (forward) de um modelo; o encoder, chamado à parte no `generate`, não entra na contagem."""
+    calls = []
+    handle = model.register_forward_hook(lambda *hook_args: calls.append(1))
+    try:
+        yield calls
+    finally:
+        handle.remove()
+
+
+def bench_speculative_decoding(args):
+    """
+    Compara a geração gulosa com e sem o modelo de rascunho.
+
+    Cada passada do modelo principal na geração assistida verifica os tokens
+    propostos e acrescenta um token próprio; os demais tokens do resumo foram
+    aceitos do rascunho. A taxa de aceitação é a razão entre esses tokens e o
+    total proposto (uma passada do rascunho por token).
+    """
+    import summarizer
+
+    summarizer.DRAFT_MODEL = args.draft_model or summarizer.DRAFT_MODEL
+    if not summarizer.DRAFT_MODEL:
+        raise SystemExit("Informe o modelo de rascunho com --draft-model ou SUMMARIZER_DRAFT_MODEL")
+
+    documents = _benchmark_documents(args)
+    pipe = summarizer.get_abstractive_pipeline()
+    draft_model = summarizer.get_draft_model()
+    if draft_model is None:
+        raise SystemExit(f"Modelo de rascunho '{summarizer.DRAFT_MODEL}' indisponível (veja o aviso acima)")
+
+    run_generation = summarizer._run_generation
+    generated = []
+
+    def counting_run_generation(texts, generation):
+        outputs = run_generation(texts, generation)
+        generated.extend(count for _summary, count in outputs)
+        return outputs
+
+    draft_id = summarizer.DRAFT_MODEL
+    summarizer._run_generation = counting_run_generation
+    results = {}
+    try:
+        for label, draft in (("sem rascunho", None), ("com rascunho", draft_id)):
+            summarizer.DRAFT_MODEL = draft
+            generated.clear()
+            timings, summaries = [], []
+            with counting_forward_calls(pipe.model) as main_calls, counting_forward_calls(draft_model) as draft_calls:
+                for text, _reference in documents:
+                    start = time.perf_counter()
+                    summaries.append(summarizer.summarize_abstractive(text, args.max_length, args.max_length // 5, decoding="greedy"))
+                    timings.append((time.perf_counter() - start) * 1000)
+            results[label] = summaries
+            report(label, timings)
+            line = f"    tokens gerados={sum(generated)}  passadas do modelo principal={len(main_calls)}"
+            if draft:
+                accepted = sum(generated) - len(main_calls)
+                line += (f"  tokens propostos={len(draft_calls)}  aceitos={accepted} "
+                         f"(taxa de aceitação={accepted / max(1, len(draft_calls)):.1%})")
+            print(line)
+            _report_reference_rouge(label, summaries, documents)
+    finally:
+        summarizer._run_generation = run_generation
+        summarizer.DRAFT_MODEL = draft_id
+
+    _report_drift("com vs sem rascunho", results["sem rascunho"], results["com rascunho"])
+
+
+SCENARIOS = {
+    "extractive-setup": bench_extractive_setup,
+    "extractive-engines": bench_extractive_engines,
+    "extractive-budget": bench_extractive_budget,
+    "health-under-load": bench_health_under_load,
+    "cold-start": bench_cold_start,
+    "abstractive-batch": bench_abstractive_batch,
+    "hierarchical-reduce": bench_hierarchical_reduce,
+    "hybrid": bench_hybrid,
+    "stream-ttft": bench_stream_ttft,
+    "length-planning": bench_length_planning,
+    "chunk-allocation": bench_chunk_allocation,
+    "microbatch-load": bench_microbatch_load,
+    "batch-endpoint": bench_batch_endpoint,
+    "admission-overload": bench_admission_overload,
+    "metrics-overhead": bench_metrics_overhead,
+    "chunker": bench_chunker,
+    "decoding-profiles": bench_decoding_profiles,
+    "abstractive-engines": bench_abstractive_engines,
+    "quantization": bench_quantization,
+    "vocab-pruning": bench_vocab_pruning,
+    "speculative-decoding": bench_speculative_decoding,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks da API de sumarização")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=50, help="Repetições por medição")
+    parser.add_argument("--sentences", type=int, default=40, help="Número de sentenças do texto sintético")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 200, 400],
+                        help="Tamanhos de documento em KB")
+    parser.add_argument("--sentence-counts", type=int, nargs="+", default=[1000, 5000, 10000],
+                        help="Número de sentenças dos documentos sintéticos")
+    parser.add_argument("--method", default="extractive", help="Método usado nas requisições de carga")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requisições simultâneas de carga")
+    parser.add_argument("--token-sizes", type=int, nargs="+", default=[5000, 20000, 50000],
+                        help="Tamanhos de documento em tokens do modelo")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8],
+                        help="Tamanhos de lote comparados")
+    parser.add_argument("--chunker-kb", type=int, default=1024, help="Tamanho em KB da entrada do chunker")
+    parser.add_argument("--corpus", help="Diretório com o corpus local (nome.txt e, opcionalmente, nome.ref.txt)")
+    parser.add_argument("--limit", type=int, help="Número máximo de documentos do corpus")
+    parser.add_argument("--engines", nargs="+", default=["torch", "onnx"], help="Motores abstrativos comparados")
+    parser.add_argument("--pruned-dir", default=os.path.join("models", "pruned"),
+                        help="Diretório do modelo gerado por `prepare_models.py prune-vocab`")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[150, 300, 600],
+                        help="Valores de max_length (caracteres) comparados")
+    parser.add_argument("--draft-model", help="Modelo de rascunho da geração assistida (padrão: SUMMARIZER_DRAFT_MODEL)")
+    parser.add_argument("--max-length", type=int, default=600, help="max_length (caracteres) das requisições")
+    parser.add_argument("--rate", type=float, default=20, help="Requisições por segundo na carga em malha aberta")
+    parser.add_argument("--admission-budget", type=float, default=float(os.getenv("SUMMARIZER_ADMISSION_BUDGET", "50000")),
+                        help="Orçamento de custo do controle de admissão")
+    parser.add_argument("--admission-queue", type=int, default=8, help="Fila do controle de admissão")
+    parser.add_argument("--queue-timeout", type=float, default=2, help="Espera máxima na fila de admissão (segundos)")
+    parser.add_argument("--requests", type=int, default=64, help="Total de requisições na carga")
+    parser.add_argument("--load-kb", type=int, default=100, help="Tamanho em KB do texto das requisições de carga")
+    args = parser.parse_args()
+    SCENARIOS[args.scenario](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("SUMMARIZER_CACHE", "1").lower() in ("1", "true", "yes")
+CACHE_MAX_ENTRIES = int(os.getenv("SUMMARIZER_CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_MB = float(os.getenv("SUMMARIZER_CACHE_MAX_MB", "64"))
+
+# Camada opcional em disco, compartilhada entre processos: habilitada quando
+# SUMMARIZER_CACHE_DIR é definido
+CACHE_DIR = os.getenv("SUMMARIZER_CACHE_DIR")
+CACHE_TTL = float(os.getenv("SUMMARIZER_CACHE_TTL", "86400"))  # Segundos
+CACHE_DISK_MAX_MB = float(os.getenv("SUMMARIZER_CACHE_DISK_MAX_MB", "512"))
+
+
+def normalize_text(text):
+    """Normaliza Unicode (NFC) e espaços para que textos equivalentes gerem a mesma chave."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_cache_key(text, method, max_length, min_length, model, decoding):
+    """
+    Calcula a chave do cache para uma requisição de sumarização.
+
+    Args:
+        text (str): Texto a ser resumido
+        method (str): Método de sumarização
+        max_length (int): Comprimento máximo do resumo
+        min_length (int): Comprimento mínimo do resumo
+        model (str): Identificador do modelo (ou motor) que gera o resumo
+        decoding (dict): Parâmetros de decodificação que influenciam o resultado
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    payload = json.dumps({
+        "text": hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest(),
+        "method": method,
+        "max_length": max_length,
+        "min_length": min_length,
+        "model": model,
+        "decoding": decoding,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Camada em disco do cache, com expiração (TTL) e limite de tamanho.
+
+    Cada entrada é um arquivo JSON nomeado pela chave. As escritas são
+    atômicas, então o diretório pode ser compartilhado por vários workers.
+    Quando o tamanho total passa do limite, os arquivos mais antigos são
+    removidos.
+    """
+
+    def __init__(self, directory, ttl, max_bytes):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = self._scan_size()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _scan_size(self):
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    total += entry.stat().st_size
+        return total
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                self._remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["summary"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key, summary):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = json.dumps({"summary": summary, "created_at": time.time()}, ensure_ascii=False).encode("utf-8")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            # Ao sobrescrever uma entrada, o arquivo antigo deixa de ocupar espaço
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Falha ao gravar entrada no cache em disco: {str(e)}")
+            return
+
+        with self._lock:
+            self._size += len(data) - previous_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._size -= size
+
+    def _evict(self):
+        """Remove expirados e, se ainda preciso, os mais antigos até 90% do limite."""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        now = time.time()
+        total = sum(size for _mtime, size, _path in entries)
+        target = self.max_bytes * 0.9
+        for mtime, size, path in entries:
+            if total <= target and now - mtime <= self.ttl:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+
+class SummaryCache:
+    """
+    Cache de resumos com uma camada LRU em memória e uma camada opcional em disco.
+
+    A camada em memória é limitada por número de entradas e por bytes. Um
+    acerto no disco promove a entrada para a memória.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=int(CACHE_MAX_MB * 2**20), disk=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """Retorna o resumo armazenado para a chave ou None."""
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return summary
+
+        if self.disk is not None:
+            summary = self.disk.get(key)
+            if summary is not None:
+                self._store(key, summary)
+                with self._lock:
+                    self._hits += 1
+                    self._disk_hits += 1
+                return summary
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key, summary):
+        """Armazena um resumo nas duas camadas."""
+        self._store(key, summary)
+        if self.disk is not None:
+            self.disk.set(key, summary)
+
+    def _store(self, key, summary):
+        size = len(summary.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.encode("utf-8"))
+            self._entries[key] = summary
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.encode("utf-8"))
+
+    @property
+    def hit_ratio(self):
+        """Fração de consultas atendidas pelo cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return self._hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Métricas do cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "disk_enabled": self.disk is not None,
+            }
+
+
+summary_cache = SummaryCache(
+    disk=DiskCache(CACHE_DIR, CACHE_TTL, int(CACHE_DISK_MAX_MB * 2**20)) if CACHE_DIR else None
+) if CACHE_ENABLED else None
@@ -0,0 +1,191 @@
+# executors.py
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Pool de processos para o caminho extrativo (CPU puro, sem estado compartilhado).
+# Os processos são criados com "spawn": o pool nasce na primeira requisição,
+# quando o modelo, o agendador de micro-lotes e os workers de jobs já têm
+# threads em execução, e um fork nesse estado pode travar o processo filho
+EXTRACTIVE_START_METHOD = "spawn"
+EXTRACTIVE_WORKERS = int(os.getenv("SUMMARIZER_EXTRACTIVE_WORKERS", str(os.cpu_count() or 2)))
+EXTRACTIVE_QUEUE_SIZE = int(os.getenv("SUMMARIZER_EXTRACTIVE_QUEUE_SIZE", "32"))
+
+# Threads dedicadas ao caminho abstrativo. O modelo é compartilhado entre elas
+# e as chamadas de geração passam pelo agendador de micro-lotes, então várias
+# threads permitem que requisições concorrentes sejam agrupadas no mesmo lote
+ABSTRACTIVE_WORKERS = int(os.getenv("SUMMARIZER_ABSTRACTIVE_WORKERS", "4"))
+ABSTRACTIVE_QUEUE_SIZE = int(os.getenv("SUMMARIZER_ABSTRACTIVE_QUEUE_SIZE", "8"))
+
+
+class ExecutorBusyError(RuntimeError):
+    """Erro lançado quando a fila de um pool de execução está cheia."""
+
+
+class BoundedExecutor:
+    """
+    Executor com profundidade de fila limitada para tarefas bloqueantes.
+
+    Aceita no máximo `max_workers + queue_size` tarefas ao mesmo tempo; as
+    excedentes são recusadas imediatamente com `ExecutorBusyError`, para que o
+    event loop nunca acumule trabalho sem limite.
+
+    Com `forward_metrics`, as métricas observadas nos processos do pool
+    voltam com o resultado de cada tarefa e são aplicadas neste processo.
+    """
+
+    def __init__(self, name, executor_factory, max_workers, queue_size, forward_metrics=False):
+        self.name = name
+        self.forward_metrics = forward_metrics
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._executor_factory = executor_factory
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._in_flight = 0
+
+    def _get_executor(self):
+        """Cria o executor subjacente na primeira utilização."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    logger.info(f"Iniciando pool '{self.name}' com {self.max_workers} workers e fila de {self.queue_size}")
+                    self._executor = self._executor_factory(self.max_workers)
+        return self._executor
+
+    @property
+    def in_flight(self):
+        """Número de tarefas em execução ou aguardando na fila."""
+        return self._in_flight
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Envia uma tarefa ao pool sem bloquear.
+
+        Returns:
+            concurrent.futures.Future: Futuro com o resultado da tarefa
+
+        Raises:
+            ExecutorBusyError: Se o pool já tiver atingido o limite de tarefas
+        """
+        return self._submit(func, args, kwargs)
+
+    def _submit(self, func, args, kwargs, trace=None):
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusyError(f"Pool '{self.name}' ocupado: limite de {self.max_workers + self.queue_size} tarefas atingido")
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if self.forward_metrics:
+                task = functools.partial(metrics.call_forwarding, func, *args, **kwargs)
+            elif trace is not None:
+                task = functools.partial(metrics.call_traced, trace, func, *args, **kwargs)
+            else:
+                task = functools.partial(func, *args, **kwargs)
+            future = self._get_executor().submit(task)
+        except Exception:
+            self._release()
+            raise
+        # A vaga só é liberada quando a tarefa termina de fato, mesmo que quem
+        # a aguardava tenha sido cancelado
+        future.add_done_callback(lambda _future: self._release())
+        if self.forward_metrics:
+            return _replay_metrics(future, trace)
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, func, *args, **kwargs):
+        """Executa `func` no pool e aguarda o resultado sem bloquear o event loop."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    async def run_traced(self, trace, func, *args, **kwargs):
+        """
+        Como `run`, registrando em `trace` (um `metrics.RequestTrace`) as
+        métricas observadas durante a tarefa e o tempo que ela passou na fila
+        do pool. Sem `trace`, equivale a `run`.
+        """
+        if trace is None:
+            return await self.run(func, *args, **kwargs)
+        submitted_at = time.perf_counter()
+        run_seconds = trace.run_seconds
+        result = await asyncio.wrap_future(self._submit(func, args, kwargs, trace))
+        elapsed = time.perf_counter() - submitted_at
+        trace.queue_seconds += max(0.0, elapsed - (trace.run_seconds - run_seconds))
+        return result
+
+    def start(self):
+        """Inicializa o executor antecipadamente."""
+        self._get_executor()
+
+    def shutdown(self, wait=True):
+        """Encerra o executor subjacente, se tiver sido criado."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            logger.info(f"Encerrando pool '{self.name}'")
+            executor.shutdown(wait=wait)
+
+
+def _replay_metrics(future, trace=None):
+    """Futuro com o resultado de uma tarefa de `metrics.call_forwarding`, aplicando as métricas que ela trouxe."""
+    result_future = Future()
+
+    def on_done(done):
+        if result_future.cancelled():
+            return
+        if done.cancelled():
+            result_future.cancel()
+        elif done.exception() is not None:
+            result_future.set_exception(done.exception())
+        else:
+            result, observations, elapsed = done.result()
+            metrics.replay(observations, trace)
+            if trace is not None:
+                trace.run_seconds += elapsed
+            result_future.set_result(result)
+
+    result_future.add_done_callback(lambda done: done.cancelled() and future.cancel())
+    future.add_done_callback(on_done)
+    return result_future
+
+
+def _init_extractive_worker():
+    """Carrega os recursos do sumy uma vez em cada processo do pool."""
+    metrics.start_forwarding()
+    from summarizer import get_extractive_resources
+    get_extractive_resources()
+
+
+extractive_executor = BoundedExecutor(
+    "extractive",
+    lambda workers: ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(EXTRACTIVE_START_METHOD),
+        initializer=_init_extractive_worker
+    ),
+    EXTRACTIVE_WORKERS,
+    EXTRACTIVE_QUEUE_SIZE,
+    forward_metrics=True,
+)
+
+abstractive_executor = BoundedExecutor(
+    "abstractive",
+    lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix="abstractive"),
+    ABSTRACTIVE_WORKERS,
+    ABSTRACTIVE_QUEUE_SIZE,
+)
@@ -0,0 +1,376 @@
+# jobs.py
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Jobs assíncronos para textos longos. A fila, o progresso por chunk e os
+# resultados ficam em um arquivo SQLite local, então jobs na fila ou em
+# execução sobrevivem a um reinício do processo. Vários processos podem
+# executar os jobs de um mesmo arquivo: cada job é retirado da fila por um
+# único dono, que renova periodicamente um heartbeat. Jobs em execução cujo
+# heartbeat ficou mais de SUMMARIZER_JOB_STALE_AFTER segundos sem renovação
+# (o dono parou) voltam para a fila. SUMMARIZER_JOB_WORKERS=0 desativa a
+# execução no processo, que continua aceitando e consultando jobs
+JOBS_DB = os.getenv("SUMMARIZER_JOBS_DB", os.path.join("data", "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("SUMMARIZER_JOB_WORKERS", "1"))
+JOB_RETENTION = float(os.getenv("SUMMARIZER_JOB_RETENTION", "604800"))  # Segundos que jobs finalizados ficam disponíveis
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("SUMMARIZER_JOB_HEARTBEAT_INTERVAL", "10"))  # Segundos
+JOB_STALE_AFTER = float(os.getenv("SUMMARIZER_JOB_STALE_AFTER", "60"))  # Segundos sem heartbeat até o job voltar à fila
+JOB_POLL_INTERVAL = 1.0  # Segundos entre consultas à fila quando não há jobs
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    summary TEXT,
+    error TEXT,
+    total_chunks INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    heartbeat_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_chunks (
+    job_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (job_id, chunk_index)
+);
+"""
+
+# Colunas adicionadas depois da primeira versão do esquema
+_MIGRATIONS = {
+    "owner": "ALTER TABLE jobs ADD COLUMN owner TEXT",
+    "heartbeat_at": "ALTER TABLE jobs ADD COLUMN heartbeat_at REAL",
+}
+
+
+class JobOwnershipLost(Exception):
+    """O job voltou para a fila (heartbeat expirado) e pode estar com outro dono."""
+
+
+def new_owner_id():
+    """Identificador único do executor de jobs: máquina, processo e um sufixo aleatório."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobStore:
+    """
+    Armazenamento dos jobs em SQLite.
+
+    Estados de um job: "queued" (na fila), "running" (em execução), "done"
+    (resumo disponível) e "failed" (erro registrado). Os resumos dos chunks
+    já gerados são gravados à medida que ficam prontos e apagados quando o
+    job termina. O arquivo é aberto no primeiro uso.
+
+    Um job em execução pertence ao `owner` que o retirou da fila. As escritas
+    de progresso e de resultado só valem para o dono atual, então um processo
+    cujo job voltou para a fila não grava por cima do novo dono.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        """Abre o banco e cria as tabelas na primeira utilização (chamado com o lock)."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql in _MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(sql)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def create(self, request, signature):
+        """
+        Coloca um novo job na fila.
+
+        Args:
+            request (dict): Parâmetros da sumarização (campos de TextInput)
+            signature (str): Configuração de chunking com que o job foi criado
+
+        Returns:
+            str: Identificador do job
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, status, request, signature, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+            (job_id, json.dumps(request, ensure_ascii=False), signature, now, now)
+        )
+        return job_id
+
+    def get(self, job_id):
+        """Retorna o job (com `done_chunks`, o número de chunks já resumidos) ou None."""
+        rows = self._execute(
+            "SELECT jobs.*, (SELECT COUNT(*) FROM job_chunks WHERE job_id = jobs.id) AS done_chunks "
+            "FROM jobs WHERE id = ?", (job_id,)
+        )
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["request"] = json.loads(job["request"])
+        return job
+
+    def claim_next(self, owner):
+        """
+        Retira da fila o job mais antigo, marcando-o como em execução por `owner`.
+
+        A consulta e a atualização rodam em uma transação `BEGIN IMMEDIATE`,
+        que bloqueia outras escritas no arquivo, então dois processos nunca
+        retiram o mesmo job.
+
+        Returns:
+            dict | None: O job, ou None se a fila estiver vazia
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+                claimed = row is not None and conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, heartbeat_at = ?, updated_at = ? "
+                    "WHERE id = ? AND status = 'queued'",
+                    (owner, time.time(), time.time(), row["id"])
+                ).rowcount == 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if claimed else None
+
+    def heartbeat(self, owner):
+        """Renova o heartbeat dos jobs em execução por `owner`."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'", (time.time(), owner))
+            return cursor.rowcount
+
+    def requeue_stale(self, max_age):
+        """Devolve à fila os jobs em execução sem heartbeat há mais de `max_age` segundos (o dono parou)."""
+        now = time.time()
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, updated_at = ? "
+                "WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (now, now - max_age)
+            )
+            return cursor.rowcount
+
+    def load_chunks(self, job_id):
+        """Resumos dos chunks já gerados, por índice do chunk."""
+        rows = self._execute("SELECT chunk_index, summary FROM job_chunks WHERE job_id = ?", (job_id,))
+        return {row["chunk_index"]: row["summary"] for row in rows}
+
+    def _owned_write(self, job_id, owner, update_sql, update_params, *statements):
+        """
+        Atualiza o job e executa `statements` em uma transação, apenas se `owner` ainda for o dono.
+
+        Raises:
+            JobOwnershipLost: Se o job não está mais em execução por `owner`
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                owned = conn.execute(f"{update_sql} WHERE id = ? AND owner = ? AND status = 'running'",
+                                     (*update_params, job_id, owner)).rowcount == 1
+                if owned:
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if not owned:
+            raise JobOwnershipLost(f"O job {job_id} não está mais em execução por {owner}")
+
+    def reset_progress(self, job_id, owner, signature):
+        """Descarta os chunks gravados e associa o job a uma nova configuração de chunking."""
+        self._owned_write(job_id, owner, "UPDATE jobs SET signature = ?, total_chunks = 0", (signature,),
+                          ("DELETE FROM job_chunks WHERE job_id = ?", (job_id,)))
+
+    def save_chunk(self, job_id, owner, index, total, summary):
+        """Grava o resumo de um chunk e o número total de chunks do job."""
+        now = time.time()
+        self._owned_write(job_id, owner, "UPDATE jobs SET total_chunks = ?, updated_at = ?, heartbeat_at = ?", (total, now, now),
+                          ("INSERT OR REPLACE INTO job_chunks (job_id, chunk_index, summary) VALUES (?, ?, ?)",
+                           (job_id, index, summary)))
+
+    def finish(self, job_id, owner, summary):
+        self._finalize(job_id, owner, "done", summary=summary)
+
+    def fail(self, job_id, owner, error):
+        self._finalize(job_id, owner, "failed", error=error)
+
+    def _finalize(self, job_id, owner, status, summary=None, error=None):
+        self._owned_write(job_id, owner, "UPDATE jobs SET status = ?, summary = ?, error = ?, owner = NULL, updated_at = ?",
+                          (status, summary, error, time.time()),
+                          ("DELETE FROM job_chunks WHERE job_id = ?", (job_id,)))
+
+    def purge(self, max_age):
+        """Remove os jobs finalizados há mais de `max_age` segundos."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (time.time() - max_age,))
+            return cursor.rowcount
+
+    def counts(self):
+        """Número de jobs por estado."""
+        return {row["status"]: row["total"] for row in self._execute(
+            "SELECT status, COUNT(*) AS total FROM jobs GROUP BY status")}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class JobRunner:
+    """
+    Executa os jobs da fila em threads de fundo.
+
+    `handler(request, completed_chunks, on_chunk)` gera o resumo de um job:
+    recebe os resumos dos chunks de uma execução anterior interrompida e
+    chama `on_chunk(index, total, summary)` a cada chunk resumido, o que grava
+    o progresso. Se a configuração de chunking mudou desde a criação do job
+    (outra `signature`), o progresso anterior é descartado.
+
+    Cada runner tem um identificador de dono próprio. Uma thread de
+    heartbeat renova os jobs em execução por ele e devolve à fila os jobs
+    de donos que pararam de renovar (processos encerrados ou travados).
+    """
+
+    def __init__(self, store, handler, signature, workers=JOB_WORKERS):
+        self.store = store
+        self.workers = workers
+        self.owner = new_owner_id()
+        self._handler = handler
+        self._signature = signature
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self):
+        """Retoma os jobs de donos que pararam e inicia as threads de execução e de heartbeat."""
+        if self.workers <= 0:
+            logger.info("Execução de jobs desativada neste processo")
+            return
+        requeued = self.store.requeue_stale(JOB_STALE_AFTER)
+        purged = self.store.purge(JOB_RETENTION)
+        logger.info(f"Iniciando {self.workers} worker(s) de jobs como '{self.owner}' "
+                    f"({requeued} jobs retomados, {purged} expirados removidos)")
+        self._stop.clear()
+        targets = [(self._loop, f"job-worker-{i}") for i in range(self.workers)]
+        targets.append((self._heartbeat_loop, "job-heartbeat"))
+        for target, name in targets:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self):
+        """Avisa os workers de que há um job novo na fila."""
+        self._wakeup.set()
+
+    def stop(self):
+        """
+        Para de retirar jobs da fila e de renovar o heartbeat.
+
+        Um job em execução não é interrompido; se o processo terminar antes
+        do fim, ele continua "running" no banco até o heartbeat expirar e
+        então volta para a fila, onde é retomado por qualquer processo.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        self._threads = []
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                self.store.heartbeat(self.owner)
+                requeued = self.store.requeue_stale(JOB_STALE_AFTER)
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao renovar o heartbeat dos jobs: {str(e)}")
+                continue
+            if requeued:
+                logger.warning(f"{requeued} job(s) sem heartbeat há mais de {JOB_STALE_AFTER:.0f} s voltaram para a fila")
+                self.notify()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim_next(self.owner)
+            except Exception:
+                logger.exception("Erro ao consultar a fila de jobs")
+                job = None
+            if job is None:
+                self._wakeup.wait(JOB_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            try:
+                self._run(job)
+            except JobOwnershipLost as e:
+                logger.warning(f"Job {job['id']} abandonado: {str(e)}")
+            except Exception as e:
+                # Falha fora do handler (ex.: sqlite3.Error ao gravar o progresso):
+                # a thread continua servindo a fila
+                logger.exception(f"Erro inesperado ao executar o job {job['id']}")
+                self._fail_quietly(job["id"], str(e))
+
+    def _fail_quietly(self, job_id, error):
+        """Marca o job como falho, sem propagar um novo erro do banco."""
+        try:
+            self.store.fail(job_id, self.owner, error)
+        except JobOwnershipLost:
+            pass
+        except Exception:
+            logger.exception(f"Não foi possível registrar a falha do job {job_id}")
+
+    def _run(self, job):
+        job_id = job["id"]
+        if job["signature"] == self._signature:
+            completed = self.store.load_chunks(job_id)
+        else:
+            logger.warning(f"Configuração de chunking do job {job_id} mudou; o progresso anterior será descartado")
+            self.store.reset_progress(job_id, self.owner, self._signature)
+            completed = {}
+        logger.info(f"Executando job {job_id} ({len(completed)} chunks já resumidos)")
+
+        def on_chunk(index, total, summary):
+            self.store.save_chunk(job_id, self.owner, index, total, summary)
+
+        start = time.perf_counter()
+        try:
+            summary = self._handler(job["request"], completed, on_chunk)
+        except JobOwnershipLost:
+            raise
+        except Exception as e:
+            logger.error(f"Erro no job {job_id}: {str(e)}")
+            self.store.fail(job_id, self.owner, str(e))
+            return
+        self.store.finish(job_id, self.owner, summary)
+        logger.info(f"Job {job_id} concluído em {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,153 @@
+# length_planning.py
+import math
+import os
+import re
+from collections import namedtuple
+
+# Os comprimentos da API são em caracteres, mas a geração é limitada em
+# tokens. A razão caracteres/token é estimada a partir do próprio texto de
+# entrada (mesmo idioma e tokenizer) e a margem cobre a variação entre o
+# texto de entrada e o resumo gerado
+DEFAULT_CHARS_PER_TOKEN = 4.0
+MIN_CHARS_PER_TOKEN = 1.5
+MAX_CHARS_PER_TOKEN = 8.0
+TOKEN_MARGIN = float(os.getenv("SUMMARIZER_TOKEN_MARGIN", "1.15"))
+
+# Alocação do orçamento entre os chunks de textos longos. Os orçamentos são
+# arredondados em múltiplos de BUDGET_STEP_CHARS para que chunks com
+# orçamentos parecidos compartilhem os parâmetros de geração (e o lote)
+MIN_CHUNK_SUMMARY_CHARS = int(os.getenv("SUMMARIZER_MIN_CHUNK_SUMMARY_CHARS", "80"))
+BUDGET_STEP_CHARS = 20
+
+_SENTENCE_END = re.compile(r'[.!?](?=\s|$)')
+
+
+class LengthPlan(namedtuple("LengthPlan", ["max_new_tokens", "min_new_tokens", "max_chars", "min_chars"])):
+    """Orçamento de uma geração: limites em tokens derivados dos limites em caracteres."""
+
+    __slots__ = ()
+
+    def generation_kwargs(self):
+        """
+        Parâmetros de geração correspondentes ao plano.
+
+        `max_chars` não é um parâmetro do `generate`: é convertido em um
+        critério de parada por caracteres na chamada ao modelo.
+        """
+        return {
+            "max_new_tokens": self.max_new_tokens,
+            "min_new_tokens": self.min_new_tokens,
+            "max_chars": self.max_chars,
+        }
+
+
+def estimate_chars_per_token(text, tokens_count):
+    """
+    Estima quantos caracteres cada token representa no texto.
+
+    Args:
+        text (str): Texto tokenizado
+        tokens_count (int): Número de tokens do texto, sem tokens especiais
+
+    Returns:
+        float: Caracteres por token, limitado a uma faixa plausível
+    """
+    if not tokens_count:
+        return DEFAULT_CHARS_PER_TOKEN
+    return min(MAX_CHARS_PER_TOKEN, max(MIN_CHARS_PER_TOKEN, len(text) / tokens_count))
+
+
+def plan_lengths(max_chars, min_chars, chars_per_token, margin=TOKEN_MARGIN):
+    """
+    Converte um orçamento em caracteres em limites de tokens para a geração.
+
+    Args:
+        max_chars (int): Comprimento máximo do resumo em caracteres
+        min_chars (int): Comprimento mínimo do resumo em caracteres
+        chars_per_token (float): Estimativa de `estimate_chars_per_token`
+        margin (float): Folga multiplicativa sobre o número estimado de tokens
+
+    Returns:
+        LengthPlan: Limites de tokens e de caracteres da geração
+    """
+    # +1 para o token de fim de sequência
+    max_new_tokens = math.ceil(max_chars / chars_per_token * margin) + 1
+    min_new_tokens = min(max_new_tokens - 1, int(min_chars / chars_per_token))
+    return LengthPlan(max_new_tokens, max(0, min_new_tokens), max_chars, min_chars)
+
+
+def allocate_chunk_budgets(weights, max_chars, min_chars_per_chunk=MIN_CHUNK_SUMMARY_CHARS, step=BUDGET_STEP_CHARS):
+    """
+    Divide o orçamento de caracteres do resumo entre os chunks, proporcionalmente aos pesos.
+
+    Os orçamentos, somados aos espaços que unem os resumos, não passam de
+    `max_chars`, de modo que o texto combinado já cabe no resumo final.
+
+    Args:
+        weights (list[float]): Peso de cada chunk (por exemplo, tamanho × relevância)
+        max_chars (int): Orçamento total em caracteres
+        min_chars_per_chunk (int): Menor resumo útil de um chunk
+        step (int): Granularidade dos orçamentos
+
+    Returns:
+        list[int] | None: Orçamento de cada chunk, ou None se o orçamento total
+        não comporta `min_chars_per_chunk` para todos os chunks
+    """
+    available = max_chars - (len(weights) - 1)
+    if not weights or available < len(weights) * min_chars_per_chunk:
+        return None
+
+    total_weight = sum(weights)
+    if total_weight <= 0:
+        weights, total_weight = [1.0] * len(weights), float(len(weights))
+
+    shares = [available * weight / total_weight for weight in weights]
+    budgets = [max(min_chars_per_chunk, step * int(share / step)) for share in shares]
+    # O mínimo por chunk pode estourar o total: tira dos maiores orçamentos
+    while sum(budgets) > available:
+        largest = max(range(len(budgets)), key=budgets.__getitem__)
+        budgets[largest] = max(min_chars_per_chunk, budgets[largest] - step)
+    # O arredondamento para baixo deixa sobras: vão para os chunks mais abaixo da sua parte
+    while available - sum(budgets) >= step:
+        neediest = max(range(len(budgets)), key=lambda i: shares[i] - budgets[i])
+        budgets[neediest] += step
+    return budgets
+
+
+class CharacterBudgetCriteria:
+    """
+    Critério de parada da geração: interrompe cada sequência ao atingir `max_chars` caracteres.
+
+    Compatível com `transformers.StoppingCriteriaList`; devolve uma decisão
+    por sequência do lote (ou por feixe, na busca por feixe), formato aceito
+    a partir do transformers 4.39.
+    """
+
+    def __init__(self, tokenizer, max_chars):
+        self.tokenizer = tokenizer
+        self.max_chars = max_chars
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        texts = self.tokenizer.batch_decode(input_ids, skip_special_tokens=True)
+        return torch.tensor([len(text.strip()) >= self.max_chars for text in texts],
+                            dtype=torch.bool, device=input_ids.device)
+
+
+def fit_to_budget(text, max_chars):
+    """
+    Garante que o resumo não passe de `max_chars` caracteres.
+
+    A geração para logo após atingir o orçamento, então o excesso é de no
+    máximo um token. O corte é feito no fim da última sentença completa que
+    couber; sem nenhuma, na última palavra, com reticências.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+
+    sentence_ends = [match.end() for match in _SENTENCE_END.finditer(text, 0, max_chars)]
+    if sentence_ends and sentence_ends[-1] >= max_chars // 2:
+        return text[:sentence_ends[-1]]
+    return text[:max(0, max_chars - 3)].rsplit(' ', 1)[0] + "..."
@@ -1,6 +1,15 @@
 # main.py
+import asyncio
+import contextlib
+import json
 import logging
-from fastapi import FastAPI, HTTPException
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
 # Configuração de logging
@@ -9,7 +18,46 @@ logger = logging.getLogger(__name__)
 
 
 # Importe as funções que você criou
-from summarizer import summarize_extractive, summarize_abstractive
+from summarizer import (
+    summarize_extractive, summarize_abstractive, summarize_hybrid, summarize_extractive_batch, summarize_abstractive_batch,
+    stream_abstractive, warm_up, is_abstractive_model_loaded, get_batch_scheduler,
+    is_draft_model_loaded, resolve_decoding, assisted_generation_params, get_abstractive_model_id, ABSTRACTIVE_ENGINE, HYBRID_EXTRACTIVE_ENGINE, DEFAULT_EXTRACTIVE_ENGINE, DEFAULT_DECODING_PROFILE,
+    MICROBATCH_ENABLED, DRAFT_MODEL, CHUNK_TOKENS, CHUNK_BUDGET_MODE, HYBRID_INPUT_TOKENS
+)
+from length_planning import DEFAULT_CHARS_PER_TOKEN
+from admission import AdmissionController, AdmissionRejected, estimate_cost, ADMISSION_ENABLED
+from executors import extractive_executor, abstractive_executor, ExecutorBusyError
+from cache import summary_cache, make_cache_key
+from jobs import JobStore, JobRunner, JOBS_DB
+from metrics import Gauge, RequestTrace, render_metrics, CHUNKS, INPUT_TOKENS, OUTPUT_TOKENS
+
+
+# Recursos carregados na inicialização: "all" (padrão), "extractive" ou "none"
+WARMUP = os.getenv("SUMMARIZER_WARMUP", "all").lower()
+
+# Número máximo de itens por requisição em /summarize/batch
+BATCH_MAX_ITEMS = int(os.getenv("SUMMARIZER_BATCH_MAX_ITEMS", "256"))
+
+# Inclui os metadados de tempo (e o cabeçalho Server-Timing) em todas as
+# respostas de /summarize, e não só nas que pedem timing=true
+TIMING_METADATA = os.getenv("SUMMARIZER_TIMING", "0").lower() in ("1", "true", "yes")
+
+admission_controller = AdmissionController() if ADMISSION_ENABLED else None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Ciclo de vida da aplicação: warm-up dos modelos e encerramento dos pools."""
+    if WARMUP in ("all", "extractive"):
+        logger.info(f"Executando warm-up dos recursos de sumarização ({WARMUP})")
+        await asyncio.to_thread(warm_up, abstractive=WARMUP == "all")
+    await asyncio.to_thread(job_runner.start)
+    yield
+    job_runner.stop()
+    extractive_executor.shutdown(wait=False)
+    abstractive_executor.shutdown(wait=False)
+    get_batch_scheduler().shutdown()
+
 
 app = FastAPI(
     title="API de Sumarização de Textos",
@@ -27,21 +75,26 @@ app = FastAPI(
     ## Métodos Disponíveis
     - `extractive`: Método tradicional baseado em extração de sentenças
     - `abstractive`: Método moderno usando IA generativa com controle de qualidade
+    - `hybrid`: Pré-seleção extrativa seguida de uma única geração abstrativa (textos longos)
 
     ## Limites
     - Texto máximo: Ilimitado (processado em chunks)
     - max_length: Até 1000 caracteres
     - min_length: Mínimo 10 caracteres
     """,
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Modelo de entrada
 class TextInput(BaseModel):
     text: str
-    method: str = "extractive"  # Método de sumarização
+    method: str = "extractive"  # Método de sumarização: extractive, abstractive ou hybrid
     max_length: int = 150       # Comprimento máximo do resumo em caracteres
     min_length: int = 30        # Comprimento mínimo do resumo em caracteres
+    decoding: str = DEFAULT_DECODING_PROFILE  # Perfil de decodificação abstrativa: greedy, beam ou sampling
+    num_beams: Optional[int] = None           # Largura do beam search (apenas com decoding="beam")
+    timing: bool = False                      # Inclui os metadados de tempo na resposta de /summarize
 
     class Config:
         """Configuração do modelo Pydantic."""
@@ -50,29 +103,125 @@ class TextInput(BaseModel):
                 "text": "Este é um exemplo de texto longo que será resumido pela API. A API pode processar textos de diferentes tamanhos e gerar resumos concisos usando métodos extrativos ou abstrativos.",
                 "method": "abstractive",
                 "max_length": 200,
-                "min_length": 50
+                "min_length": 50,
+                "decoding": "beam",
+                "num_beams": 4
             }
         }
 
+# Metadados de tempo de uma requisição (timing=true ou SUMMARIZER_TIMING=1)
+class SummaryMetadata(BaseModel):
+    method: str
+    cache_hit: bool
+    chunks: int = 0                   # Chunks de texto longo resumidos pelo modelo
+    input_tokens: int = 0             # Tokens do texto no caminho abstrativo
+    output_tokens: int = 0            # Tokens gerados pelo modelo (chunks, reduções e resumo)
+    queue_wait_ms: float = 0.0        # Espera no controle de admissão e na fila do pool
+    stages_ms: Dict[str, float] = {}  # Duração de cada etapa do pipeline (mesmas etapas de /metrics)
+    total_ms: float
+
+
 # Modelo de saída
 class SummaryOutput(BaseModel):
     summary: str
+    cached: bool = False                     # Resumo servido pelo cache
+    cache_hit_ratio: Optional[float] = None  # Taxa de acertos do cache (None se desabilitado)
+    metadata: Optional[SummaryMetadata] = None  # Apenas com timing=true ou SUMMARIZER_TIMING=1
 
-@app.post("/summarize", response_model=SummaryOutput)
-async def get_summary(payload: TextInput):
-    """
-    Recebe um texto e retorna seu resumo usando métodos extrativo ou abstrativo.
 
-    - **text**: O texto a ser sumarizado (obrigatório).
-    - **method**: Método de sumarização - 'extractive' (padrão) ou 'abstractive'.
-    - **max_length**: Comprimento máximo do resumo em caracteres (padrão: 150, máximo: 1000).
-    - **min_length**: Comprimento mínimo do resumo em caracteres (padrão: 30, mínimo: 10).
+# Modelos do endpoint em lote
+class BatchInput(BaseModel):
+    items: List[TextInput]
 
-    O método extrativo seleciona as sentenças mais importantes do texto original.
-    O método abstrativo gera um novo texto que resume o conteúdo de forma concisa.
+
+class BatchItemOutput(BaseModel):
+    index: int                     # Posição do item na requisição
+    status: str                    # "ok" ou "error"
+    status_code: int = 200         # Código HTTP que o item teria em /summarize
+    summary: Optional[str] = None
+    cached: bool = False
+    detail: Optional[str] = None   # Motivo da falha
+
+
+class BatchOutput(BaseModel):
+    results: List[BatchItemOutput]
+    cache_hit_ratio: Optional[float] = None
+
+
+# Modelo de estado dos jobs assíncronos
+class JobStatus(BaseModel):
+    job_id: str
+    status: str                  # queued, running, done ou failed
+    method: str
+    total_chunks: int = 0        # Chunks do texto (0 até o primeiro chunk ser resumido ou em textos curtos)
+    done_chunks: int = 0         # Chunks já resumidos
+    created_at: float
+    updated_at: float
+    error: Optional[str] = None  # Motivo da falha, com status "failed"
+
+
+def _cache_key(payload):
+    """Chave do cache: texto normalizado, método, comprimentos, modelo e decodificação (com a geração assistida)."""
+    if payload.method == "extractive":
+        model, decoding = f"lsa-{DEFAULT_EXTRACTIVE_ENGINE}", {}
+    elif payload.method == "hybrid":
+        model = f"lsa-{HYBRID_EXTRACTIVE_ENGINE}+{get_abstractive_model_id()}"
+        decoding = resolve_decoding(payload.decoding, payload.num_beams)
+    else:
+        model, decoding = get_abstractive_model_id(), resolve_decoding(payload.decoding, payload.num_beams)
+    if payload.method != "extractive":
+        decoding.update(assisted_generation_params(decoding))
+    return make_cache_key(payload.text, payload.method, payload.max_length, payload.min_length, model, decoding)
+
+
+def _request_cost(payload):
+    """Custo estimado de uma requisição para o controle de admissão."""
+    num_beams = 1
+    if payload.method != "extractive":
+        num_beams = resolve_decoding(payload.decoding, payload.num_beams).get("num_beams", 1)
+    return estimate_cost(len(payload.text), payload.method, num_beams, HYBRID_INPUT_TOKENS * DEFAULT_CHARS_PER_TOKEN)
+
+
+def _admission(cost):
+    """Reserva o custo da requisição no controle de admissão (sem efeito com o controle desabilitado)."""
+    if admission_controller is None:
+        return contextlib.nullcontext()
+    return admission_controller.admit(cost)
+
+
+def _rejected(e):
+    """Resposta 429 de uma requisição recusada pelo controle de admissão."""
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def _timing_metadata(response, method, trace, start, cache_hit=False):
     """
-    logger.info(f"Recebida requisição de sumarização. Método: {payload.method}, Texto length: {len(payload.text)}")
+    Metadados de tempo da requisição, também enviados no cabeçalho Server-Timing.
+
+    Returns:
+        SummaryMetadata | None: None se a requisição não está sendo rastreada
+    """
+    if trace is None:
+        return None
+    metadata = SummaryMetadata(
+        method=method,
+        cache_hit=cache_hit,
+        chunks=int(trace.total(CHUNKS)),
+        input_tokens=int(trace.total(INPUT_TOKENS)),
+        output_tokens=int(trace.total(OUTPUT_TOKENS)),
+        queue_wait_ms=trace.queue_seconds * 1000,
+        stages_ms={stage: seconds * 1000 for stage, seconds in trace.stage_seconds().items()},
+        total_ms=(time.perf_counter() - start) * 1000
+    )
+    entries = [f'cache;desc="{"hit" if cache_hit else "miss"}"', f"queue;dur={metadata.queue_wait_ms:.1f}"]
+    entries.extend(f"{stage};dur={ms:.1f}" for stage, ms in metadata.stages_ms.items())
+    entries.append(f"total;dur={metadata.total_ms:.1f}")
+    response.headers["Server-Timing"] = ", ".join(entries)
+    return metadata
+
 
+def _validate_payload(payload):
+    """Valida o texto e os parâmetros de uma requisição, lançando HTTPException 400."""
     # Validação de entrada
     if not payload.text or not payload.text.strip():
         logger.warning("Tentativa de sumarização com texto vazio")
@@ -88,25 +237,372 @@ async def get_summary(payload: TextInput):
     if payload.min_length < 10:
         logger.warning(f"min_length muito baixo: {payload.min_length}")
         raise HTTPException(status_code=400, detail="min_length deve ser pelo menos 10 caracteres")
+    try:
+        resolve_decoding(payload.decoding, payload.num_beams)
+    except ValueError as e:
+        logger.warning(f"Parâmetros de decodificação inválidos: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/summarize", response_model=SummaryOutput)
+async def get_summary(payload: TextInput, response: Response):
+    """
+    Recebe um texto e retorna seu resumo usando métodos extrativo ou abstrativo.
+
+    - **text**: O texto a ser sumarizado (obrigatório).
+    - **method**: Método de sumarização - 'extractive' (padrão), 'abstractive' ou 'hybrid'.
+    - **max_length**: Comprimento máximo do resumo em caracteres (padrão: 150, máximo: 1000).
+    - **min_length**: Comprimento mínimo do resumo em caracteres (padrão: 30, mínimo: 10).
+    - **decoding**: Perfil de decodificação abstrativa - 'greedy', 'beam' ou 'sampling' (padrão).
+    - **num_beams**: Largura do beam search, apenas com decoding='beam' (1 a 8).
+    - **timing**: Inclui em `metadata` e no cabeçalho Server-Timing a divisão do tempo da requisição.
+
+    O método extrativo seleciona as sentenças mais importantes do texto original.
+    O método abstrativo gera um novo texto que resume o conteúdo de forma concisa.
+    O método híbrido pré-seleciona as sentenças mais relevantes e gera o resumo
+    abstrativo apenas delas, com uma única chamada ao modelo.
+    """
+    logger.info(f"Recebida requisição de sumarização. Método: {payload.method}, Texto length: {len(payload.text)}")
+    start = time.perf_counter()
+    _validate_payload(payload)
+    trace = RequestTrace() if payload.timing or TIMING_METADATA else None
 
     try:
-        if payload.method == "extractive":
-            logger.info("Iniciando sumarização extrativa")
-            summary = summarize_extractive(payload.text, payload.max_length, payload.min_length)
-        elif payload.method == "abstractive":
-            logger.info("Iniciando sumarização abstrativa")
-            summary = summarize_abstractive(payload.text, payload.max_length, payload.min_length)
-        else:
+        cache_key = None
+        if summary_cache is not None and payload.method in ("extractive", "abstractive", "hybrid"):
+            cache_key = _cache_key(payload)
+            cached_summary = summary_cache.get(cache_key)
+            if cached_summary is not None:
+                logger.info("Resumo encontrado no cache")
+                return SummaryOutput(summary=cached_summary, cached=True, cache_hit_ratio=summary_cache.hit_ratio,
+                                     metadata=_timing_metadata(response, payload.method, trace, start, cache_hit=True))
+
+        if payload.method not in ("extractive", "abstractive", "hybrid"):
             logger.warning(f"Método inválido solicitado: {payload.method}")
-            raise HTTPException(status_code=400, detail="Método inválido. Escolha 'extractive' ou 'abstractive'.")
+            raise HTTPException(status_code=400, detail="Método inválido. Escolha 'extractive', 'abstractive' ou 'hybrid'.")
+
+        # A sumarização roda fora do event loop: extrativa em um pool de
+        # processos e abstrativa nas threads dedicadas ao modelo. O custo
+        # estimado fica reservado no controle de admissão até o fim
+        admission_start = time.perf_counter()
+        async with _admission(_request_cost(payload)):
+            if trace is not None:
+                trace.queue_seconds += time.perf_counter() - admission_start
+            if payload.method == "extractive":
+                logger.info("Iniciando sumarização extrativa")
+                summary = await extractive_executor.run_traced(trace, summarize_extractive, payload.text, payload.max_length, payload.min_length)
+            elif payload.method == "abstractive":
+                logger.info("Iniciando sumarização abstrativa")
+                summary = await abstractive_executor.run_traced(trace, summarize_abstractive, payload.text, payload.max_length, payload.min_length, payload.decoding, payload.num_beams)
+            else:
+                logger.info("Iniciando sumarização híbrida")
+                summary = await abstractive_executor.run_traced(trace, summarize_hybrid, payload.text, payload.max_length, payload.min_length, payload.decoding, payload.num_beams)
+
+        if cache_key is not None:
+            summary_cache.set(cache_key, summary)
 
         logger.info(f"Sumarização concluída com sucesso. Resumo length: {len(summary)}")
-        return SummaryOutput(summary=summary)
+        return SummaryOutput(
+            summary=summary,
+            cache_hit_ratio=summary_cache.hit_ratio if summary_cache is not None else None,
+            metadata=_timing_metadata(response, payload.method, trace, start)
+        )
 
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        raise _rejected(e)
+    except ExecutorBusyError as e:
+        logger.warning(f"Requisição recusada por falta de capacidade: {str(e)}")
+        raise HTTPException(status_code=503, detail="Servidor ocupado. Tente novamente em instantes.")
     except Exception as e:
         logger.error(f"Erro durante a sumarização: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor: {str(e)}")
 
+
+async def _run_batch_group(executor, func, items):
+    """
+    Executa um grupo de itens do lote em uma tarefa do pool.
+
+    Returns:
+        list[tuple[str | None, int, str | None]]: (resumo, código HTTP, erro) de cada item
+    """
+    try:
+        outputs = await executor.run(func, items)
+    except ExecutorBusyError as e:
+        logger.warning(f"Grupo do lote recusado por falta de capacidade: {str(e)}")
+        return [(None, 503, "Servidor ocupado. Tente novamente em instantes.")] * len(items)
+    except Exception as e:
+        logger.error(f"Erro durante a sumarização em lote: {str(e)}")
+        return [(None, 500, f"Erro interno do servidor: {str(e)}")] * len(items)
+    results = []
+    for summary, error in outputs:
+        if error is None:
+            results.append((summary, 200, None))
+        elif isinstance(error, ValueError):
+            # Parâmetros inválidos do item, como em _validate_payload
+            results.append((None, 400, str(error)))
+        else:
+            results.append((None, 500, f"Erro interno do servidor: {error}"))
+    return results
+
+
+@app.post("/summarize/batch", response_model=BatchOutput)
+async def summarize_batch(payload: BatchInput):
+    """
+    Resume vários textos em uma única requisição.
+
+    Cada item aceita os mesmos campos de `/summarize`. Os itens extrativos são
+    divididos entre os processos do pool extrativo e os abstrativos são
+    agrupados em chamadas em lote ao modelo. Os resultados voltam na ordem
+    dos itens, cada um com o seu status: um item inválido ou com falha não
+    afeta os demais.
+    """
+    items = payload.items
+    logger.info(f"Recebida requisição de sumarização em lote com {len(items)} itens")
+    if not items:
+        raise HTTPException(status_code=400, detail="A lista de itens não pode ser vazia.")
+    if len(items) > BATCH_MAX_ITEMS:
+        logger.warning(f"Lote muito grande: {len(items)} itens")
+        raise HTTPException(status_code=400, detail=f"O lote não pode exceder {BATCH_MAX_ITEMS} itens")
+
+    results = [None] * len(items)
+    cache_keys = {}
+    extractive, abstractive = [], []
+    for i, item in enumerate(items):
+        try:
+            _validate_payload(item)
+            if item.method not in ("extractive", "abstractive", "hybrid"):
+                raise HTTPException(status_code=400, detail="Método inválido. Escolha 'extractive', 'abstractive' ou 'hybrid'.")
+        except HTTPException as e:
+            results[i] = BatchItemOutput(index=i, status="error", status_code=e.status_code, detail=e.detail)
+            continue
+
+        if summary_cache is not None:
+            cache_keys[i] = _cache_key(item)
+            cached_summary = summary_cache.get(cache_keys[i])
+            if cached_summary is not None:
+                results[i] = BatchItemOutput(index=i, status="ok", summary=cached_summary, cached=True)
+                continue
+        (extractive if item.method == "extractive" else abstractive).append(i)
+
+    # Uma fatia dos itens extrativos por processo do pool e uma única tarefa
+    # abstrativa, para que os textos curtos compartilhem as chamadas ao modelo
+    groups = []
+    if extractive:
+        size = math.ceil(len(extractive) / extractive_executor.max_workers)
+        for start in range(0, len(extractive), size):
+            indices = extractive[start:start + size]
+            groups.append((indices, _run_batch_group(extractive_executor, summarize_extractive_batch, [
+                (items[i].text, items[i].max_length, items[i].min_length) for i in indices
+            ])))
+    if abstractive:
+        groups.append((abstractive, _run_batch_group(abstractive_executor, summarize_abstractive_batch, [
+            (items[i].method, items[i].text, items[i].max_length, items[i].min_length, items[i].decoding, items[i].num_beams)
+            for i in abstractive
+        ])))
+    logger.info(f"Lote com {len(extractive)} itens extrativos e {len(abstractive)} abstrativos em {len(groups)} tarefas")
+
+    cost = sum(_request_cost(items[i]) for i in extractive + abstractive)
+    try:
+        async with _admission(cost):
+            outputs = await asyncio.gather(*(coroutine for _indices, coroutine in groups))
+    except AdmissionRejected as e:
+        for _indices, coroutine in groups:
+            coroutine.close()
+        raise _rejected(e)
+    for (indices, _coroutine), group_outputs in zip(groups, outputs):
+        for i, (summary, status_code, detail) in zip(indices, group_outputs):
+            if summary is None:
+                results[i] = BatchItemOutput(index=i, status="error", status_code=status_code, detail=detail)
+                continue
+            if i in cache_keys:
+                summary_cache.set(cache_keys[i], summary)
+            results[i] = BatchItemOutput(index=i, status="ok", summary=summary)
+
+    failed = sum(1 for result in results if result.status == "error")
+    logger.info(f"Sumarização em lote concluída: {len(results) - failed} itens com sucesso, {failed} com erro")
+    return BatchOutput(
+        results=results,
+        cache_hit_ratio=summary_cache.hit_ratio if summary_cache is not None else None
+    )
+
+
+def _job_signature():
+    """Configuração que define a divisão em chunks: o progresso salvo só é reaproveitado com a mesma."""
+    return f"{get_abstractive_model_id()}|{CHUNK_TOKENS}|{CHUNK_BUDGET_MODE}"
+
+
+def _run_job(request, completed_chunks, on_chunk):
+    """Gera o resumo de um job, usando e alimentando o cache como `/summarize`."""
+    payload = TextInput(**request)
+    cache_key = _cache_key(payload) if summary_cache is not None else None
+    cached_summary = summary_cache.get(cache_key) if cache_key is not None else None
+    if cached_summary is not None:
+        logger.info("Resumo do job encontrado no cache")
+        return cached_summary
+
+    if payload.method == "hybrid":
+        summary = summarize_hybrid(payload.text, payload.max_length, payload.min_length, payload.decoding, payload.num_beams)
+    else:
+        summary = summarize_abstractive(payload.text, payload.max_length, payload.min_length, payload.decoding,
+                                        payload.num_beams, completed_chunks=completed_chunks, on_chunk=on_chunk)
+    if cache_key is not None:
+        summary_cache.set(cache_key, summary)
+    return summary
+
+
+job_store = JobStore(JOBS_DB)
+job_runner = JobRunner(job_store, _run_job, _job_signature())
+
+
+def _job_status(job):
+    # Os chunks gravados são apagados quando o job termina
+    done_chunks = job["total_chunks"] if job["status"] == "done" else job["done_chunks"]
+    return JobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        method=job["request"]["method"],
+        total_chunks=job["total_chunks"],
+        done_chunks=done_chunks,
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        error=job["error"]
+    )
+
+
+async def _get_job(job_id):
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return job
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(payload: TextInput):
+    """
+    Cria um job assíncrono de sumarização para textos longos.
+
+    Aceita os mesmos campos de `/summarize`, com method='abstractive' ou
+    'hybrid', e retorna imediatamente o identificador do job. O estado é
+    consultado em `/jobs/{job_id}` e o resumo em `/jobs/{job_id}/result`.
+    """
+    logger.info(f"Recebido job de sumarização. Método: {payload.method}, Texto length: {len(payload.text)}")
+    _validate_payload(payload)
+    if payload.method not in ("abstractive", "hybrid"):
+        logger.warning(f"Método inválido para jobs: {payload.method}")
+        raise HTTPException(status_code=400, detail="Jobs suportam apenas os métodos 'abstractive' e 'hybrid'.")
+
+    job_id = await asyncio.to_thread(job_store.create, payload.model_dump(), _job_signature())
+    job_runner.notify()
+    logger.info(f"Job {job_id} criado")
+    return _job_status(await _get_job(job_id))
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Estado e progresso (chunks resumidos) de um job."""
+    return _job_status(await _get_job(job_id))
+
+
+@app.get("/jobs/{job_id}/result", response_model=SummaryOutput)
+async def get_job_result(job_id: str):
+    """
+    Resumo de um job concluído.
+
+    Retorna 409 enquanto o job estiver na fila ou em execução e 500 se ele falhou.
+    """
+    job = await _get_job(job_id)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"O job falhou: {job['error']}")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job ainda não concluído (status: {job['status']}).")
+    return SummaryOutput(summary=job["summary"])
+
+
+def _sse(event):
+    """Formata um evento no padrão Server-Sent Events."""
+    name = event.pop("event")
+    return f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@app.post("/summarize/stream")
+async def stream_summary(payload: TextInput):
+    """
+    Gera um resumo abstrativo enviando o progresso como Server-Sent Events.
+
+    Aceita os mesmos campos de `/summarize`, com method='abstractive'. Eventos:
+
+    - **token**: Trecho recém-gerado (`text`) da última geração: o resumo de um texto curto ou o
+      resumo final de um texto longo. Só o perfil 'greedy' envia um evento por trecho; com 'beam'
+      e 'sampling' (padrão) o texto chega em um único evento.
+    - **chunk**: Resumo de um chunk (`index`, `total`, `summary`), para textos longos.
+    - **summary**: Resumo final (`summary`), com o tempo até o primeiro evento (`ttft_ms`) e o total (`total_ms`).
+    - **error**: Falha durante a geração (`detail`).
+    """
+    logger.info(f"Recebida requisição de sumarização em streaming. Texto length: {len(payload.text)}")
+    _validate_payload(payload)
+    if payload.method != "abstractive":
+        logger.warning(f"Método inválido para streaming: {payload.method}")
+        raise HTTPException(status_code=400, detail="O streaming suporta apenas o método 'abstractive'.")
+
+    cache_key = _cache_key(payload) if summary_cache is not None else None
+    cached_summary = summary_cache.get(cache_key) if cache_key is not None else None
+    if cached_summary is not None:
+        logger.info("Resumo encontrado no cache")
+
+        async def cached_events():
+            yield _sse({"event": "summary", "summary": cached_summary, "cached": True, "ttft_ms": 0.0, "total_ms": 0.0})
+
+        return StreamingResponse(cached_events(), media_type="text/event-stream")
+
+    cost = _request_cost(payload)
+    if admission_controller is not None:
+        try:
+            await admission_controller.acquire(cost)
+        except AdmissionRejected as e:
+            raise _rejected(e)
+
+    def release():
+        if admission_controller is not None:
+            admission_controller.release(cost)
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def produce():
+        # Roda em uma thread do pool abstrativo e repassa cada evento ao event
+        # loop. A geração continua até o fim mesmo se o cliente desconectar
+        try:
+            for event in stream_abstractive(payload.text, payload.max_length, payload.min_length, payload.decoding, payload.num_beams):
+                loop.call_soon_threadsafe(events.put_nowait, event)
+        except Exception as e:
+            logger.error(f"Erro durante a sumarização em streaming: {str(e)}")
+            loop.call_soon_threadsafe(events.put_nowait, {"event": "error", "detail": f"Erro interno do servidor: {str(e)}"})
+        finally:
+            # O custo fica reservado até o fim da geração, mesmo que o cliente desconecte
+            loop.call_soon_threadsafe(release)
+            loop.call_soon_threadsafe(events.put_nowait, None)
+
+    try:
+        abstractive_executor.submit(produce)
+    except ExecutorBusyError as e:
+        release()
+        logger.warning(f"Requisição recusada por falta de capacidade: {str(e)}")
+        raise HTTPException(status_code=503, detail="Servidor ocupado. Tente novamente em instantes.")
+
+    async def event_stream():
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            if event["event"] == "summary" and cache_key is not None:
+                summary_cache.set(cache_key, event["summary"])
+            yield _sse(event)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/")
 async def root():
     """Endpoint raiz que retorna informações sobre a API."""
@@ -114,7 +610,7 @@ async def root():
     return {
         "message": "Bem-vindo à API de Sumarização de Textos!",
         "docs": "/docs",
-        "methods": ["extractive", "abstractive"],
+        "methods": ["extractive", "abstractive", "hybrid"],
         "version": "2.0.0"
     }
 
@@ -126,5 +622,56 @@ async def health_check():
         "status": "healthy",
         "timestamp": "2025-09-04T20:26:42.253Z",
         "version": "2.0.0",
-        "model": "csebuetnlp/mT5_multilingual_XLSum"
+        "model": get_abstractive_model_id(),
+        "engine": ABSTRACTIVE_ENGINE,
+        "model_loaded": is_abstractive_model_loaded(),
+        "draft_model": DRAFT_MODEL,
+        "draft_model_loaded": is_draft_model_loaded()
+    }
+
+# Profundidade das filas, lida no momento da coleta de /metrics
+Gauge("summarizer_executor_tasks", "Tarefas em execução ou na fila de cada pool.",
+      lambda: {(executor.name,): executor.in_flight for executor in (extractive_executor, abstractive_executor)},
+      ("pool",))
+Gauge("summarizer_microbatch_queue_depth", "Textos aguardando no agendador de micro-lotes.",
+      lambda: get_batch_scheduler().stats()["queue_depth"])
+Gauge("summarizer_admission_queued", "Requisições aguardando na fila do controle de admissão.",
+      lambda: admission_controller.stats()["queued"] if admission_controller is not None else 0)
+Gauge("summarizer_admission_in_flight_cost", "Custo estimado das requisições admitidas em execução.",
+      lambda: admission_controller.stats()["in_flight_cost"] if admission_controller is not None else 0)
+Gauge("summarizer_cache_hit_ratio", "Fração de consultas atendidas pelo cache de resumos.",
+      lambda: summary_cache.hit_ratio if summary_cache is not None else 0)
+Gauge("summarizer_jobs", "Jobs assíncronos por estado.",
+      lambda: {(status,): total for status, total in job_store.counts().items()},
+      ("status",))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métricas no formato de texto do Prometheus: duração das etapas, tokens, chunks e filas."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/stats")
+async def stats():
+    """Métricas internas de execução: pools, agendador de micro-lotes e cache."""
+    return {
+        "executors": {
+            executor.name: {
+                "in_flight": executor.in_flight,
+                "workers": executor.max_workers,
+                "queue_size": executor.queue_size
+            }
+            for executor in (extractive_executor, abstractive_executor)
+        },
+        "abstractive_batching": {
+            "enabled": MICROBATCH_ENABLED,
+            **get_batch_scheduler().stats()
+        },
+        "cache": summary_cache.stats() if summary_cache is not None else {"enabled": False},
+        "admission": admission_controller.stats() if admission_controller is not None else {"enabled": False},
+        "jobs": {
+            "workers": job_runner.workers,
+            **await asyncio.to_thread(job_store.counts)
+        }
     }
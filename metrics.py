@@ -0,0 +1,280 @@
+# metrics.py
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Métricas no formato de texto do Prometheus, sem dependências externas. As
+# observações custam uma busca binária nos limites do histograma e um lock
+# por série; o texto só é montado quando /metrics é consultado
+METRICS_ENABLED = os.getenv("SUMMARIZER_METRICS", "1").lower() in ("1", "true", "yes")
+
+# Limites (em segundos) dos histogramas de latência: de 1 ms a 2 min
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+# Nos processos do pool extrativo as observações não vão para o registro
+# local (que ninguém consulta): ficam acumuladas aqui e voltam ao processo
+# principal junto com o resultado de cada tarefa (ver `call_forwarding`)
+_forwarded = None
+
+# Métricas da requisição em execução na thread atual (ver `RequestTrace`)
+_local = threading.local()
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base das métricas: nome, descrição, rótulos e registro global."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            if name in _registry:
+                raise ValueError(f"Métrica já registrada: {name}")
+            _registry[name] = self
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def _record(self, labels, value):
+        """Aplica uma observação (com os rótulos em tupla) ao valor da série."""
+        raise NotImplementedError
+
+    def _apply(self, labels, value):
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.record(self.name, labels, value)
+        if _forwarded is not None:
+            _forwarded.append((self.name, labels, value))
+        elif METRICS_ENABLED:
+            self._record(labels, value)
+
+    def render(self):
+        """Linhas da métrica no formato de texto do Prometheus."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Contador monotônico, opcionalmente com rótulos."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {} if self.labelnames else {(): 0}
+
+    def inc(self, amount=1, *labels):
+        self._apply(labels, amount)
+
+    def _record(self, labels, value):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Histograma cumulativo com limites fixos, opcionalmente com rótulos."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # rótulos -> [contagens por faixa (+ faixa +Inf), soma]
+
+    def observe(self, value, *labels):
+        self._apply(labels, value)
+
+    def _record(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        """Mede a duração do bloco em segundos."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self):
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        lines = self._header()
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Valor instantâneo lido no momento da coleta.
+
+    `callback()` devolve o valor (sem rótulos) ou um dicionário
+    {tupla de rótulos: valor}. Assim filas e pools não precisam atualizar
+    nada a cada tarefa.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, callback, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+
+    def render(self):
+        values = self._callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+def render_metrics():
+    """Todas as métricas registradas no formato de texto do Prometheus (versão 0.0.4)."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RequestTrace:
+    """
+    Métricas observadas durante uma única requisição.
+
+    Enquanto está ativo na thread (ver `call_traced`), recebe as mesmas
+    observações enviadas ao registro global, somadas por métrica e rótulos,
+    independentemente de SUMMARIZER_METRICS. Também acumula o tempo de
+    execução das tarefas (`run_seconds`) e o tempo de espera em filas
+    (`queue_seconds`).
+    """
+
+    def __init__(self):
+        self.values = {}  # (nome da métrica, rótulos) -> soma das observações
+        self.run_seconds = 0.0
+        self.queue_seconds = 0.0
+
+    def record(self, name, labels, value):
+        key = (name, labels)
+        self.values[key] = self.values.get(key, 0) + value
+
+    def total(self, metric, *labels):
+        """Soma das observações de `metric` com os rótulos dados."""
+        return self.values.get((metric.name, labels), 0)
+
+    def stage_seconds(self):
+        """Duração total de cada etapa, na ordem em que as etapas apareceram."""
+        return {labels[0]: value for (name, labels), value in self.values.items() if name == STAGE_SECONDS.name}
+
+
+def is_tracing():
+    """Indica se há uma requisição sendo rastreada na thread atual."""
+    return getattr(_local, "trace", None) is not None
+
+
+def call_traced(trace, func, *args, **kwargs):
+    """Executa `func` registrando em `trace` as métricas observadas nesta thread."""
+    previous = getattr(_local, "trace", None)
+    _local.trace = trace
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        trace.run_seconds += time.perf_counter() - start
+        _local.trace = previous
+
+
+def start_forwarding():
+    """Passa a acumular as observações deste processo para enviá-las ao processo principal."""
+    global _forwarded
+    _forwarded = []
+
+
+def call_forwarding(func, *args, **kwargs):
+    """
+    Executa `func` em um processo do pool e devolve (resultado, observações, duração).
+
+    As observações feitas durante a chamada são devolvidas junto com o
+    resultado, para que o processo principal as aplique com `replay`.
+    """
+    global _forwarded
+    if _forwarded is None:
+        _forwarded = []
+    del _forwarded[:]
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    observations, _forwarded = _forwarded, []
+    return result, observations, elapsed
+
+
+def replay(observations, trace=None):
+    """Aplica ao registro local (e a `trace`, se houver) as observações vindas de outro processo."""
+    for name, labels, value in observations:
+        if trace is not None:
+            trace.record(name, labels, value)
+        metric = _registry.get(name)
+        if metric is not None and METRICS_ENABLED:
+            metric._record(labels, value)
+
+
+# Métricas do pipeline de sumarização
+STAGE_SECONDS = Histogram(
+    "summarizer_stage_seconds",
+    "Duração de cada etapa do pipeline de sumarização (a geração dos chunks é medida por chunk).",
+    ("stage",)
+)
+CHUNKS = Counter("summarizer_chunks_total", "Chunks de textos longos resumidos pelo modelo abstrativo.")
+INPUT_TOKENS = Counter("summarizer_input_tokens_total", "Tokens dos textos recebidos pelo caminho abstrativo.")
+OUTPUT_TOKENS = Counter("summarizer_output_tokens_total", "Tokens gerados pelo modelo abstrativo (chunks, reduções e resumos).")
+
+
+def stage_timer(stage):
+    """Mede a duração de uma etapa do pipeline em `summarizer_stage_seconds`."""
+    return STAGE_SECONDS.time(stage)
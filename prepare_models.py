@@ -0,0 +1,198 @@
+# prepare_models.py
+"""
+Preparação offline de variantes do modelo abstrativo.
+
+Uso:
+    python prepare_models.py <comando> [opções]
+
+Comandos disponíveis:
+    onnx         Exporta o modelo para ONNX Runtime (encoder, decoder e decoder com cache)
+    quantize     Quantiza as camadas lineares do modelo em int8 (quantização dinâmica)
+    prune-vocab  Reduz o vocabulário aos tokens usados em um corpus local em português
+"""
+import argparse
+import collections
+import glob
+import json
+import logging
+import os
+import time
+
+from summarizer import (
+    ABSTRACTIVE_MODEL, ABSTRACTIVE_MODEL_DIR, ONNX_MODEL_DIR, QUANTIZED_MODEL_DIR, quantize_model, save_quantized_model
+)
+
+logger = logging.getLogger("prepare_models")
+
+PRUNED_MODEL_DIR = os.path.join("models", "pruned")
+
+
+def _directory_size_mb(directory):
+    total = 0
+    for root, _dirs, files in os.walk(directory):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 2**20
+
+
+def export_onnx(args):
+    """Exporta o modelo para ONNX, com o decoder usando cache de chaves/valores."""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    logger.info(f"Exportando '{args.source}' para ONNX em '{args.output}'")
+    start = time.perf_counter()
+    model = ORTModelForSeq2SeqLM.from_pretrained(args.source, export=True, use_cache=True)
+    model.save_pretrained(args.output)
+    AutoTokenizer.from_pretrained(args.source, use_fast=True).save_pretrained(args.output)
+    logger.info(f"Modelo ONNX salvo em {time.perf_counter() - start:.1f} s ({_directory_size_mb(args.output):.0f} MB)")
+
+
+def quantize(args):
+    """Quantiza o modelo em int8 e salva os artefatos usados por SUMMARIZER_MODEL_PRECISION=int8."""
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    logger.info(f"Quantizando '{args.source}' para int8 em '{args.output}'")
+    start = time.perf_counter()
+    model = AutoModelForSeq2SeqLM.from_pretrained(args.source).eval()
+    save_quantized_model(quantize_model(model), AutoTokenizer.from_pretrained(args.source, use_fast=True), args.output, args.source)
+    logger.info(f"Modelo quantizado salvo em {time.perf_counter() - start:.1f} s ({_directory_size_mb(args.output):.0f} MB)")
+
+
+def _read_corpus(directory):
+    """Lê os arquivos .txt do corpus (artigos e, se houver, resumos de referência)."""
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.txt"), recursive=True)):
+        with open(path, "r", encoding="utf-8") as f:
+            yield f.read()
+
+
+def _is_latin_character(piece):
+    """Peças de um único caractere latino (com acentos e pontuação) são sempre mantidas."""
+    text = piece.lstrip("\u2581")
+    return len(text) == 1 and ord(text) < 0x250
+
+
+def count_corpus_tokens(model_tokenizer, directory):
+    """Frequência de cada id de token no corpus, tokenizado como na sumarização."""
+    counts = collections.Counter()
+    documents = 0
+    for text in _read_corpus(directory):
+        counts.update(model_tokenizer("summarize: " + text, add_special_tokens=True)["input_ids"])
+        documents += 1
+    logger.info(f"Corpus com {documents} arquivos e {sum(counts.values())} tokens ({len(counts)} tokens distintos)")
+    return counts
+
+
+def prune_vocab(args):
+    """
+    Gera um modelo com vocabulário restrito aos tokens do corpus em português.
+
+    Mantém os tokens especiais, os caracteres latinos isolados (para que
+    palavras novas ainda sejam segmentadas sem virar <unk>) e todo token com
+    frequência mínima `--min-count` no corpus. O modelo SentencePiece é
+    reescrito apenas com essas peças, na ordem original, e as linhas
+    correspondentes das matrizes de embedding e da cabeça de saída são
+    copiadas para o novo modelo.
+    """
+    if not args.corpus:
+        raise SystemExit("Informe o corpus com --corpus")
+
+    import torch
+    try:
+        from sentencepiece import sentencepiece_model_pb2
+    except ImportError as e:
+        raise SystemExit(
+            f"prune-vocab requer os pacotes sentencepiece e protobuf: pip install -r requirements.txt ({str(e)})"
+        )
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    model_tokenizer = AutoTokenizer.from_pretrained(args.source, use_fast=True)
+    slow_tokenizer = AutoTokenizer.from_pretrained(args.source, use_fast=False)
+    model = AutoModelForSeq2SeqLM.from_pretrained(args.source).eval()
+    counts = count_corpus_tokens(model_tokenizer, args.corpus)
+
+    spm = sentencepiece_model_pb2.ModelProto()
+    with open(slow_tokenizer.vocab_file, "rb") as f:
+        spm.ParseFromString(f.read())
+
+    normal = sentencepiece_model_pb2.ModelProto.SentencePiece.NORMAL
+    kept = [
+        index for index, piece in enumerate(spm.pieces)
+        if piece.type != normal or counts[index] >= args.min_count or _is_latin_character(piece.piece)
+    ]
+    # Os tokens especiais (<pad>, </s>, <unk>) são as primeiras peças do
+    # vocabulário, então mantêm os mesmos ids no modelo reduzido
+    kept_pieces = [spm.pieces[index] for index in kept]
+    del spm.pieces[:]
+    spm.pieces.extend(kept_pieces)
+
+    original_parameters = model.num_parameters()
+    index = torch.tensor(kept)
+    with torch.no_grad():
+        embeddings = model.get_input_embeddings()
+        model.set_input_embeddings(torch.nn.Embedding.from_pretrained(
+            embeddings.weight[index].clone(), freeze=False, padding_idx=embeddings.padding_idx))
+        if not model.config.tie_word_embeddings:
+            lm_head = model.get_output_embeddings()
+            new_head = torch.nn.Linear(lm_head.in_features, len(kept), bias=lm_head.bias is not None)
+            new_head.weight.copy_(lm_head.weight[index])
+            if lm_head.bias is not None:
+                new_head.bias.copy_(lm_head.bias[index])
+            model.set_output_embeddings(new_head)
+    model.config.vocab_size = len(kept)
+    model.tie_weights()
+
+    model.save_pretrained(args.output)
+    # O tokenizer é salvo a partir do modelo SentencePiece reduzido; o
+    # tokenizer rápido é reconstruído a partir dele
+    slow_tokenizer.save_pretrained(args.output)
+    with open(os.path.join(args.output, os.path.basename(slow_tokenizer.vocab_file)), "wb") as f:
+        f.write(spm.SerializeToString())
+    for name in ("tokenizer.json", "added_tokens.json"):
+        if os.path.exists(os.path.join(args.output, name)):
+            os.remove(os.path.join(args.output, name))
+    AutoTokenizer.from_pretrained(args.output, use_fast=True).save_pretrained(args.output)
+
+    coverage = sum(counts[index] for index in kept) / max(1, sum(counts.values()))
+    summary = {
+        "source": args.source,
+        "original_vocab_size": len(model_tokenizer),
+        "vocab_size": len(kept),
+        "original_parameters": original_parameters,
+        "parameters": model.num_parameters(),
+        "corpus_token_coverage": coverage,
+    }
+    with open(os.path.join(args.output, "pruning.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    logger.info(
+        f"Vocabulário reduzido de {len(model_tokenizer)} para {len(kept)} tokens; parâmetros "
+        f"{original_parameters / 1e6:.1f} M -> {model.num_parameters() / 1e6:.1f} M "
+        f"(cobertura do corpus: {coverage:.2%})"
+    )
+
+
+COMMANDS = {
+    "onnx": (export_onnx, ONNX_MODEL_DIR),
+    "quantize": (quantize, QUANTIZED_MODEL_DIR),
+    "prune-vocab": (prune_vocab, PRUNED_MODEL_DIR),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preparação offline de variantes do modelo abstrativo")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--source", default=ABSTRACTIVE_MODEL_DIR or ABSTRACTIVE_MODEL,
+                        help="Modelo de origem (identificador no Hub ou diretório local)")
+    parser.add_argument("--output", help="Diretório de saída (padrão: o diretório configurado para o comando)")
+    parser.add_argument("--corpus", help="Diretório com os textos em português (.txt) usados em prune-vocab")
+    parser.add_argument("--min-count", type=int, default=1,
+                        help="Frequência mínima no corpus para um token ser mantido em prune-vocab")
+    args = parser.parse_args()
+
+    func, default_output = COMMANDS[args.command]
+    args.output = args.output or default_output
+    os.makedirs(args.output, exist_ok=True)
+    func(args)
+
+
+if __name__ == "__main__":
+    main()
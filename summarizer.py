@@ -1,72 +1,405 @@
 # summarizer.py
+import json
 import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import namedtuple
+
+import numpy
+from scipy import sparse
+from scipy.sparse.linalg import svds
+from sumy.models.dom import ObjectDocumentModel, Paragraph, Sentence
 from sumy.parsers.plaintext import PlaintextParser
 from sumy.nlp.tokenizers import Tokenizer
 from sumy.summarizers.lsa import LsaSummarizer as Summarizer
 from sumy.nlp.stemmers import Stemmer
 from sumy.utils import get_stop_words
-from huggingface_hub import login
+
+from batching import MicroBatchScheduler
+from metrics import stage_timer, STAGE_SECONDS, CHUNKS, INPUT_TOKENS, OUTPUT_TOKENS
+from length_planning import (
+    CharacterBudgetCriteria, allocate_chunk_budgets, estimate_chars_per_token, fit_to_budget, plan_lengths
+)
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-with open("API_HuggingFace", "r") as f:
-    token = f.read().strip()
-login(token)
-
 LANGUAGE = "portuguese"
 DEFAULT_SENTENCES_COUNT = 3  # Número padrão de sentenças para resumo extrativo
 DEFAULT_MAX_LENGTH = 150  # Comprimento máximo padrão do resumo
 DEFAULT_MIN_LENGTH = 30   # Comprimento mínimo padrão do resumo
 
-def summarize_extractive(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAULT_MIN_LENGTH):
+# Motores de ranking extrativo: "sumy" (LsaSummarizer com matriz densa e SVD
+# completa) ou "sparse" (TF-IDF esparso com SVD truncada, indicado para
+# documentos grandes)
+EXTRACTIVE_ENGINES = ("sumy", "sparse")
+DEFAULT_EXTRACTIVE_ENGINE = os.getenv("SUMMARIZER_EXTRACTIVE_ENGINE", "sumy")
+SPARSE_LSA_COMPONENTS = int(os.getenv("SUMMARIZER_SPARSE_LSA_COMPONENTS", "10"))  # Vetores singulares calculados
+KNAPSACK_MAX_CANDIDATES = 1000  # Sentenças mais bem pontuadas consideradas na seleção por orçamento
+
+# Modelo abstrativo. É carregado sob demanda (ou no warm-up da API), nunca na
+# importação do módulo. Com SUMMARIZER_MODEL_DIR o modelo vem de um diretório
+# local; com SUMMARIZER_OFFLINE=1 nenhuma chamada ao Hugging Face Hub é feita.
+ABSTRACTIVE_MODEL = os.getenv("SUMMARIZER_MODEL", "csebuetnlp/mT5_multilingual_XLSum")
+ABSTRACTIVE_MODEL_DIR = os.getenv("SUMMARIZER_MODEL_DIR")
+OFFLINE_MODE = os.getenv("SUMMARIZER_OFFLINE", "0").lower() in ("1", "true", "yes")
+HF_TOKEN_FILE = os.getenv("SUMMARIZER_HF_TOKEN_FILE", "API_HuggingFace")
+# Motores de inferência do modelo abstrativo: "torch" (transformers, padrão) ou
+# "onnx" (ONNX Runtime na CPU, com cache de chaves/valores no decoder). O
+# modelo ONNX é exportado antes com `python prepare_models.py onnx`
+ABSTRACTIVE_ENGINES = ("torch", "onnx")
+ABSTRACTIVE_ENGINE = os.getenv("SUMMARIZER_ABSTRACTIVE_ENGINE", "torch")
+ONNX_MODEL_DIR = os.getenv("SUMMARIZER_ONNX_DIR", os.path.join("models", "onnx"))
+
+# Precisão dos pesos no motor "torch": "fp32" ou "int8" (quantização dinâmica
+# das camadas lineares). O modelo quantizado é salvo em SUMMARIZER_QUANTIZED_DIR
+# na primeira carga e reaproveitado nas seguintes, enquanto o modelo de origem
+# registrado junto dos artefatos for o mesmo configurado
+MODEL_PRECISIONS = ("fp32", "int8")
+MODEL_PRECISION = os.getenv("SUMMARIZER_MODEL_PRECISION", "fp32")
+QUANTIZED_MODEL_DIR = os.getenv("SUMMARIZER_QUANTIZED_DIR", os.path.join("models", "int8"))
+QUANTIZED_WEIGHTS_FILE = "quantized_model.pt"
+QUANTIZED_METADATA_FILE = "quantization.json"
+
+# Geração assistida (decodificação especulativa): um modelo seq2seq bem menor,
+# com o mesmo vocabulário, propõe alguns tokens por vez e o modelo principal os
+# verifica em uma única passada. Vale para o motor "torch", um texto por
+# chamada e sem beam search (perfil "greedy"). Sem SUMMARIZER_DRAFT_MODEL, ou
+# se o modelo de rascunho não puder ser usado, a geração segue sem assistência
+DRAFT_MODEL = os.getenv("SUMMARIZER_DRAFT_MODEL")
+DRAFT_NUM_TOKENS = int(os.getenv("SUMMARIZER_DRAFT_TOKENS", "5"))  # Tokens propostos na primeira rodada (ajustado a cada rodada)
+ABSTRACTIVE_BATCH_SIZE = int(os.getenv("SUMMARIZER_ABSTRACTIVE_BATCH_SIZE", "4"))  # Chunks por chamada ao modelo
+MAX_INPUT_TOKENS = 512  # Limite de entrada do modelo mT5
+CHUNK_TOKENS = MAX_INPUT_TOKENS - 50  # Tamanho dos chunks e janelas, com margem de segurança
+
+# Método híbrido: o ranking extrativo escolhe as sentenças mais relevantes até
+# HYBRID_INPUT_TOKENS e o modelo abstrativo resume apenas esse trecho, em uma
+# única chamada de geração
+HYBRID_EXTRACTIVE_ENGINE = os.getenv("SUMMARIZER_HYBRID_ENGINE", "sparse")
+HYBRID_INPUT_TOKENS = int(os.getenv("SUMMARIZER_HYBRID_INPUT_TOKENS", str(CHUNK_TOKENS)))
+
+# Distribuição do orçamento do resumo entre os chunks de textos longos:
+# "proportional" (pelo tamanho e pela relevância LSA de cada chunk, somando no
+# máximo max_length) ou "uniform" (mesma parte para todos, com um mínimo por
+# chunk, o que costuma exigir o resumo final)
+CHUNK_BUDGET_MODES = ("proportional", "uniform")
+CHUNK_BUDGET_MODE = os.getenv("SUMMARIZER_CHUNK_BUDGET", "proportional")
+CHUNK_SALIENCE_WEIGHT = 0.5  # Peso da relevância (0 a 1) em relação ao tamanho do chunk
+
+# Micro-batching entre requisições: textos de chamadas concorrentes esperam
+# até MICROBATCH_WAIT_MS para serem processados juntos no mesmo lote
+MICROBATCH_ENABLED = os.getenv("SUMMARIZER_MICROBATCH", "1").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_SIZE = int(os.getenv("SUMMARIZER_MICROBATCH_MAX_SIZE", "8"))
+MICROBATCH_WAIT_MS = float(os.getenv("SUMMARIZER_MICROBATCH_WAIT_MS", "10"))
+
+# Perfis de decodificação do modelo abstrativo. "greedy" e "beam" são
+# determinísticos (mesma entrada, mesmo resumo); "sampling" é o beam-sampling
+# original, mais caro e não reprodutível
+DECODING_PROFILES = {
+    "greedy": {
+        "do_sample": False,
+        "num_beams": 1,
+        "no_repeat_ngram_size": 3,  # Evitar repetições
+        "repetition_penalty": 1.2,  # Penalizar repetições
+    },
+    "beam": {
+        "do_sample": False,
+        "num_beams": 4,  # Largura padrão, configurável por requisição
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+        "length_penalty": 1.0,  # Penalidade de comprimento
+        "repetition_penalty": 1.2,
+    },
+    "sampling": {
+        "do_sample": True,  # Habilitar sampling para mais diversidade
+        "temperature": 0.3,  # Baixa temperatura para consistência
+        "top_p": 0.9,  # Nucleus sampling
+        "top_k": 50,  # Top-k sampling
+        "num_beams": 4,  # Beam search para qualidade
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+        "length_penalty": 1.0,
+        "repetition_penalty": 1.2,
+    },
+}
+DEFAULT_DECODING_PROFILE = os.getenv("SUMMARIZER_DECODING_PROFILE", "sampling")
+MAX_NUM_BEAMS = 8  # Largura máxima aceita para o perfil "beam"
+
+
+def resolve_decoding(profile=None, num_beams=None):
+    """
+    Retorna os parâmetros de geração de um perfil de decodificação.
+
+    Args:
+        profile (str): Nome do perfil - 'greedy', 'beam' ou 'sampling' (padrão: DEFAULT_DECODING_PROFILE)
+        num_beams (int): Largura do beam search; aceita apenas com o perfil 'beam'
+
+    Returns:
+        dict: Parâmetros repassados ao `generate` do modelo
+
+    Raises:
+        ValueError: Se o perfil ou a largura do beam forem inválidos
+    """
+    profile = profile or DEFAULT_DECODING_PROFILE
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Perfil de decodificação inválido: {profile}. Escolha entre {', '.join(DECODING_PROFILES)}")
+
+    params = dict(DECODING_PROFILES[profile])
+    if num_beams is not None:
+        if profile != "beam":
+            raise ValueError("num_beams só pode ser definido com o perfil de decodificação 'beam'")
+        if not 1 <= num_beams <= MAX_NUM_BEAMS:
+            raise ValueError(f"num_beams deve estar entre 1 e {MAX_NUM_BEAMS}")
+        params["num_beams"] = num_beams
+    return params
+
+
+# Registro de recursos do sumy por idioma. Tokenizer (que carrega o punkt do
+# NLTK), Stemmer, stop words e LsaSummarizer são construídos uma única vez e
+# reutilizados em todas as requisições.
+_extractive_resources = {}
+_extractive_resources_lock = threading.Lock()
+
+
+class ExtractiveResources:
+    """Objetos do sumy reutilizáveis entre chamadas para um idioma."""
+
+    def __init__(self, language):
+        self.language = language
+        self.tokenizer = Tokenizer(language)
+        self.stemmer = Stemmer(language)
+        self.summarizer = Summarizer(self.stemmer)
+        self.summarizer.stop_words = get_stop_words(language)
+
+
+def get_extractive_resources(language=LANGUAGE):
+    """
+    Retorna os recursos extrativos do idioma, criando-os na primeira chamada.
+
+    Os objetos retornados só são lidos durante a sumarização, então podem ser
+    compartilhados entre threads com segurança.
+
+    Args:
+        language (str): Idioma dos recursos (padrão: português)
+
+    Returns:
+        ExtractiveResources: Tokenizer, stemmer e sumarizador LSA prontos para uso
+    """
+    resources = _extractive_resources.get(language)
+    if resources is None:
+        with _extractive_resources_lock:
+            resources = _extractive_resources.get(language)
+            if resources is None:
+                logger.info(f"Inicializando recursos extrativos para o idioma '{language}'")
+                resources = ExtractiveResources(language)
+                _extractive_resources[language] = resources
+    return resources
+
+
+# Fim de sentença seguido de espaço, usado no chunking do caminho abstrativo
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Sentença do documento com sua posição original e pontuação LSA
+RankedSentence = namedtuple("RankedSentence", ("text", "order", "score"))
+
+
+def rank_sentences(text, language=LANGUAGE, engine=DEFAULT_EXTRACTIVE_ENGINE):
+    """
+    Calcula a pontuação LSA de todas as sentenças do texto com uma única SVD.
+
+    Devolve o vetor completo de pontuações em vez de apenas as N melhores
+    sentenças. Assim qualquer ajuste posterior de comprimento reaproveita o
+    mesmo ranking sem refazer a decomposição.
+
+    Args:
+        text (str): Texto a ser ranqueado
+        language (str): Idioma do texto
+        engine (str): Motor de ranking - 'sumy' ou 'sparse'
+
+    Returns:
+        list[RankedSentence]: Sentenças na ordem do documento com suas pontuações
+    """
+    if engine not in EXTRACTIVE_ENGINES:
+        raise ValueError(f"Motor extrativo inválido: {engine}. Escolha entre {', '.join(EXTRACTIVE_ENGINES)}")
+
+    resources = get_extractive_resources(language)
+    with stage_timer("tokenization"):
+        document = PlaintextParser.from_string(text, resources.tokenizer).document
+
+    with stage_timer("lsa_ranking"):
+        if engine == "sparse":
+            ranks = _rank_sparse(document, resources.summarizer)
+        else:
+            ranks = _rank_sumy(document, resources.summarizer)
+
+    return [
+        RankedSentence(str(sentence), order, float(score))
+        for order, (sentence, score) in enumerate(zip(document.sentences, ranks))
+    ]
+
+
+def _rank_sumy(document, summarizer):
+    """Replica o cálculo do LsaSummarizer do sumy: matriz densa e SVD completa."""
+    dictionary = summarizer._create_dictionary(document)
+    if not dictionary:
+        return []
+
+    matrix = summarizer._create_matrix(document, dictionary)
+    matrix = summarizer._compute_term_frequency(matrix)
+    _u, sigma, v = numpy.linalg.svd(matrix, full_matrices=False)
+    return summarizer._compute_ranks(sigma, v)
+
+
+def _rank_sparse(document, summarizer):
+    """
+    Ranking LSA sobre uma matriz TF-IDF esparsa termo × sentença.
+
+    Calcula apenas os `SPARSE_LSA_COMPONENTS` maiores valores singulares com
+    `scipy.sparse.linalg.svds`, evitando a matriz densa e a SVD completa do
+    sumy em documentos grandes.
+    """
+    stop_words = summarizer.stop_words
+    stems = {}  # Cache de radicais: o stemmer é a parte mais cara da tokenização
+    dictionary = {}
+    rows, cols = [], []
+
+    sentences = document.sentences
+    for col, sentence in enumerate(sentences):
+        for word in sentence.words:
+            word = summarizer.normalize_word(word)
+            if word in stop_words:
+                continue
+            stem = stems.get(word)
+            if stem is None:
+                stem = stems[word] = summarizer.stem_word(word)
+            rows.append(dictionary.setdefault(stem, len(dictionary)))
+            cols.append(col)
+
+    if not dictionary:
+        return []
+
+    # Contagens termo × sentença (entradas repetidas são somadas na conversão)
+    counts = sparse.csr_matrix(
+        (numpy.ones(len(rows)), (rows, cols)),
+        shape=(len(dictionary), len(sentences))
+    )
+    counts.sum_duplicates()
+
+    # TF sublinear × IDF suavizado, com colunas normalizadas (norma L2)
+    sentences_count = counts.shape[1]
+    document_frequency = numpy.diff(counts.indptr)
+    idf = numpy.log((1.0 + sentences_count) / (1.0 + document_frequency)) + 1.0
+    counts.data = 1.0 + numpy.log(counts.data)
+    matrix = sparse.diags(idf) @ counts
+    norms = numpy.sqrt(numpy.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = (matrix @ sparse.diags(1.0 / norms)).tocsc()
+
+    k = min(SPARSE_LSA_COMPONENTS, min(matrix.shape) - 1)
+    if k < 1:
+        # Matriz pequena demais para a SVD truncada
+        _u, sigma, v = numpy.linalg.svd(matrix.toarray(), full_matrices=False)
+    else:
+        _u, sigma, v = svds(matrix, k=k, random_state=0)
+
+    return numpy.sqrt((sigma[:, None] ** 2 * v ** 2).sum(axis=0))
+
+
+def select_sentences_within_budget(ranked, max_length, min_length=0, max_candidates=KNAPSACK_MAX_CANDIDATES):
+    """
+    Escolhe sentenças inteiras que cabem no orçamento de caracteres.
+
+    Resolve uma mochila 0/1 sobre o ranking: cada sentença custa seu
+    comprimento mais o espaço separador e vale sua pontuação LSA. A
+    programação dinâmica procura o conjunto de maior pontuação cujo
+    comprimento final fique entre `min_length` e `max_length`; se nenhum
+    conjunto atingir o mínimo, devolve o de maior pontuação que caiba no
+    máximo.
+
+    Args:
+        ranked (list[RankedSentence]): Ranking retornado por `rank_sentences`
+        max_length (int): Comprimento máximo do resumo em caracteres
+        min_length (int): Comprimento mínimo do resumo em caracteres
+        max_candidates (int): Quantidade de sentenças mais bem pontuadas consideradas
+
+    Returns:
+        list[RankedSentence]: Sentenças escolhidas na ordem do documento
+    """
+    # Juntar n sentenças custa sum(len + 1) - 1 caracteres, então a capacidade
+    # da mochila é max_length + 1 com peso len + 1 por sentença
+    capacity = max_length + 1
+    candidates = [s for s in ranked if len(s.text) + 1 <= capacity]
+    candidates = sorted(candidates, key=lambda s: s.score, reverse=True)[:max_candidates]
+    if not candidates:
+        return []
+
+    # best[c]: maior pontuação com peso total exatamente c (-inf se impossível)
+    best = numpy.full(capacity + 1, -numpy.inf)
+    best[0] = 0.0
+    taken = numpy.zeros((len(candidates), capacity + 1), dtype=bool)
+
+    for i, sentence in enumerate(candidates):
+        weight = len(sentence.text) + 1
+        with_item = best[:-weight] + sentence.score
+        improves = with_item > best[weight:]
+        taken[i, weight:] = improves
+        best[weight:] = numpy.where(improves, with_item, best[weight:])
+
+    # Preferir conjuntos que atinjam o min_length; senão, o melhor que couber
+    lower = min(capacity, min_length + 1)
+    if numpy.isfinite(best[lower:]).any():
+        weight = lower + int(numpy.argmax(best[lower:]))
+    else:
+        weight = int(numpy.argmax(best))
+
+    selected = []
+    for i in range(len(candidates) - 1, -1, -1):
+        if taken[i, weight]:
+            selected.append(candidates[i])
+            weight -= len(candidates[i].text) + 1
+
+    return sorted(selected, key=lambda s: s.order)
+
+
+def summarize_extractive(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAULT_MIN_LENGTH, engine=DEFAULT_EXTRACTIVE_ENGINE):
     """
     Gera um resumo extrativo do texto usando o algoritmo LSA.
 
+    As sentenças são escolhidas inteiras dentro do orçamento de caracteres
+    (ver `select_sentences_within_budget`), sem cortar o texto depois.
+
     Args:
         text (str): Texto a ser resumido
-        max_length (int): Comprimento máximo aproximado do resumo em caracteres
+        max_length (int): Comprimento máximo do resumo em caracteres
         min_length (int): Comprimento mínimo aproximado do resumo em caracteres
+        engine (str): Motor de ranking - 'sumy' (padrão) ou 'sparse'
 
     Returns:
         str: Resumo extrativo do texto
     """
-    logger.info(f"Iniciando sumarização extrativa. Texto length: {len(text)}, max_length: {max_length}, min_length: {min_length}")
+    logger.info(f"Iniciando sumarização extrativa. Texto length: {len(text)}, max_length: {max_length}, min_length: {min_length}, engine: {engine}")
 
     try:
-        parser = PlaintextParser.from_string(text, Tokenizer(LANGUAGE))
-        stemmer = Stemmer(LANGUAGE)
-        summarizer = Summarizer(stemmer)
-        summarizer.stop_words = get_stop_words(LANGUAGE)
-
-        # Estimar número de sentenças baseado no comprimento desejado
-        # Aproximadamente 100-150 caracteres por sentença em português
-        avg_chars_per_sentence = 120
-        estimated_sentences = max(1, min(10, max_length // avg_chars_per_sentence))
-        sentences_count = max(DEFAULT_SENTENCES_COUNT, estimated_sentences)
-
-        logger.info(f"Usando {sentences_count} sentenças para o resumo")
-
-        summary_sentences = []
-        for sentence in summarizer(parser.document, sentences_count):
-            summary_sentences.append(str(sentence))
-
-        result = " ".join(summary_sentences)
-
-        # Ajustar comprimento se necessário
-        if len(result) > max_length:
-            result = result[:max_length].rsplit(' ', 1)[0] + "..."
-        elif len(result) < min_length and len(summary_sentences) < sentences_count * 2:
-            # Tentar adicionar mais sentenças se estiver muito curto
-            additional_sentences = []
-            for sentence in summarizer(parser.document, sentences_count + 2):
-                if str(sentence) not in summary_sentences:
-                    additional_sentences.append(str(sentence))
-                    if len(" ".join(summary_sentences + additional_sentences)) >= min_length:
-                        break
-            if additional_sentences:
-                result = " ".join(summary_sentences + additional_sentences[:2])
+        ranked = rank_sentences(text, LANGUAGE, engine)
+        summary_sentences = select_sentences_within_budget(ranked, max_length, min_length)
+
+        if summary_sentences:
+            logger.info(f"Selecionadas {len(summary_sentences)} de {len(ranked)} sentenças dentro do orçamento")
+            result = " ".join(s.text for s in summary_sentences)
+        elif ranked:
+            # Nenhuma sentença cabe no orçamento: cortar a mais bem pontuada
+            logger.warning("Nenhuma sentença cabe em max_length, truncando a sentença mais relevante")
+            best = max(ranked, key=lambda s: s.score)
+            result = fit_to_budget(best.text, max_length)
+        else:
+            result = ""
+
+        if len(result) < min_length:
+            logger.warning(f"Resumo extrativo abaixo do mínimo: {len(result)} caracteres")
 
         logger.info(f"Resumo extrativo gerado com sucesso. Length: {len(result)}")
         return result
@@ -75,30 +408,778 @@ def summarize_extractive(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAULT
         logger.error(f"Erro na sumarização extrativa: {str(e)}")
         raise
 
-# Adicione isso ao summarizer.py
-from transformers import pipeline
 
-# Use um modelo pré-treinado em português
-# Carregar o modelo pode demorar um pouco na primeira vez
-summarizer_abstractive_pipeline = pipeline(
-    "summarization",
-    model="csebuetnlp/mT5_multilingual_XLSum"
-)
-tokenizer = summarizer_abstractive_pipeline.tokenizer
+def summarize_extractive_batch(items, engine=DEFAULT_EXTRACTIVE_ENGINE):
+    """
+    Resume vários textos com o método extrativo em uma única tarefa.
+
+    Cada processo do pool extrativo recebe uma fatia dos itens de um lote, o
+    que evita uma ida e volta entre processos por texto. A falha de um item
+    não interrompe os demais.
+
+    Args:
+        items (list[tuple[str, int, int]]): (texto, max_length, min_length) de cada item
+        engine (str): Motor de ranking - 'sumy' ou 'sparse'
+
+    Returns:
+        list[tuple[str | None, str | None]]: (resumo, erro) de cada item, na ordem de `items`
+    """
+    results = []
+    for text, max_length, min_length in items:
+        try:
+            results.append((summarize_extractive(text, max_length, min_length, engine), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+_abstractive_pipeline = None
+_abstractive_pipeline_lock = threading.Lock()
+_generation_lock = threading.Lock()  # Serializa as chamadas ao modelo entre threads
+_batch_scheduler = None
+_draft_model = None
+_draft_model_checked = False
+_draft_model_lock = threading.Lock()
+
+
+def _login_huggingface():
+    """Autentica no Hugging Face Hub se existir um arquivo de token."""
+    if not os.path.exists(HF_TOKEN_FILE):
+        logger.info(f"Arquivo de token '{HF_TOKEN_FILE}' não encontrado, acessando o Hub sem autenticação")
+        return
+
+    from huggingface_hub import login
+
+    with open(HF_TOKEN_FILE, "r") as f:
+        token = f.read().strip()
+    login(token)
+
+
+def get_abstractive_model_id():
+    """Identificador do modelo abstrativo em uso (origem e motor de inferência)."""
+    if ABSTRACTIVE_ENGINE == "onnx":
+        return f"onnx:{ONNX_MODEL_DIR}"
+    if MODEL_PRECISION == "int8":
+        return f"{ABSTRACTIVE_MODEL_DIR or ABSTRACTIVE_MODEL}:int8"
+    return ABSTRACTIVE_MODEL_DIR or ABSTRACTIVE_MODEL
+
+
+def _load_onnx_model(directory):
+    """Carrega o modelo exportado para ONNX Runtime, com cache de chaves/valores."""
+    if not os.path.isdir(directory):
+        raise RuntimeError(
+            f"Modelo ONNX não encontrado em '{directory}'. Exporte-o com `python prepare_models.py onnx`"
+        )
+
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError(
+            "O motor ONNX requer o optimum-onnx. Instale-o com `pip install -r requirements-onnx.txt`"
+        ) from e
+
+    return ORTModelForSeq2SeqLM.from_pretrained(directory, use_cache=True, provider="CPUExecutionProvider")
+
+
+def quantize_model(model):
+    """Aplica quantização dinâmica int8 às camadas lineares do modelo (inferência na CPU)."""
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantization_source(source, revision=None):
+    """
+    Identificação do modelo de origem gravada junto dos artefatos quantizados.
+
+    Diretórios locais são registrados pelo caminho absoluto; modelos do Hub,
+    pelo identificador e pelo commit de onde foram baixados.
+    """
+    if os.path.isdir(source):
+        return {"source": os.path.abspath(source), "revision": None}
+    return {"source": source, "revision": revision}
+
+
+def save_quantized_model(model, model_tokenizer, directory, source):
+    """
+    Salva um modelo quantizado com `quantize_model` para ser reaproveitado.
+
+    Os pesos quantizados não são suportados por `save_pretrained`, então são
+    gravados como state_dict do PyTorch, junto da configuração, do tokenizer
+    e da identificação do modelo de origem (`quantization_source`).
+    """
+    import torch
+
+    os.makedirs(directory, exist_ok=True)
+    # A origem anterior deixa de valer enquanto os artefatos são substituídos
+    metadata_path = os.path.join(directory, QUANTIZED_METADATA_FILE)
+    if os.path.exists(metadata_path):
+        os.remove(metadata_path)
+    model.config.save_pretrained(directory)
+    model.generation_config.save_pretrained(directory)
+    model_tokenizer.save_pretrained(directory)
+    weights_path = os.path.join(directory, QUANTIZED_WEIGHTS_FILE)
+    torch.save(model.state_dict(), f"{weights_path}.tmp")
+    os.replace(f"{weights_path}.tmp", weights_path)
+    # Gravado por último: artefatos sem ele são considerados incompletos
+    with open(f"{metadata_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(quantization_source(source, getattr(model.config, "_commit_hash", None)), f, indent=2)
+    os.replace(f"{metadata_path}.tmp", metadata_path)
+
+
+def _quantized_artifacts_match(source, local_only):
+    """Indica se os artefatos em QUANTIZED_MODEL_DIR foram gerados a partir de `source`."""
+    from transformers import AutoConfig
+
+    weights_path = os.path.join(QUANTIZED_MODEL_DIR, QUANTIZED_WEIGHTS_FILE)
+    metadata_path = os.path.join(QUANTIZED_MODEL_DIR, QUANTIZED_METADATA_FILE)
+    if not os.path.exists(weights_path):
+        return False
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        logger.warning(f"Artefatos quantizados em '{QUANTIZED_MODEL_DIR}' sem origem registrada; o modelo será quantizado de novo")
+        return False
+
+    revision = None
+    if not os.path.isdir(source):
+        try:
+            revision = getattr(AutoConfig.from_pretrained(source, local_files_only=local_only), "_commit_hash", None)
+        except OSError as e:
+            logger.warning(f"Não foi possível consultar a revisão de '{source}' ({str(e)}); comparando apenas a origem")
+            revision = saved.get("revision")
+    current = quantization_source(source, revision)
+    if saved != current:
+        logger.warning(
+            f"Artefatos quantizados em '{QUANTIZED_MODEL_DIR}' foram gerados a partir de {saved}, "
+            f"mas o modelo configurado é {current}; o modelo será quantizado de novo"
+        )
+        return False
+    return True
+
+
+def _load_quantized_model(source, local_only):
+    """
+    Carrega o modelo int8 salvo e seu tokenizer ou, sem artefatos do mesmo
+    modelo de origem, quantiza o modelo fp32 e os salva.
+
+    Returns:
+        tuple: (modelo, tokenizer)
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM, AutoTokenizer, GenerationConfig
+
+    if _quantized_artifacts_match(source, local_only):
+        logger.info(f"Carregando modelo quantizado de '{QUANTIZED_MODEL_DIR}'")
+        weights_path = os.path.join(QUANTIZED_MODEL_DIR, QUANTIZED_WEIGHTS_FILE)
+        model = quantize_model(AutoModelForSeq2SeqLM.from_config(AutoConfig.from_pretrained(QUANTIZED_MODEL_DIR)))
+        model.load_state_dict(torch.load(weights_path, weights_only=True))
+        model.generation_config = GenerationConfig.from_pretrained(QUANTIZED_MODEL_DIR)
+        model_tokenizer = AutoTokenizer.from_pretrained(QUANTIZED_MODEL_DIR, use_fast=True, local_files_only=True)
+        return model.eval(), model_tokenizer
+
+    logger.info(f"Quantizando modelo '{source}' para int8")
+    model = quantize_model(AutoModelForSeq2SeqLM.from_pretrained(source, local_files_only=local_only).eval())
+    model_tokenizer = AutoTokenizer.from_pretrained(source, use_fast=True, local_files_only=local_only)
+    try:
+        save_quantized_model(model, model_tokenizer, QUANTIZED_MODEL_DIR, source)
+        logger.info(f"Modelo quantizado salvo em '{QUANTIZED_MODEL_DIR}'")
+    except OSError as e:
+        logger.warning(f"Falha ao salvar o modelo quantizado: {str(e)}")
+    return model, model_tokenizer
+
+
+def get_abstractive_pipeline():
+    """
+    Retorna o pipeline de sumarização abstrativa, carregando-o na primeira chamada.
+
+    Em modo offline (ou quando SUMMARIZER_MODEL_DIR aponta para um diretório
+    local) o modelo é lido apenas do disco, sem login nem acesso à rede. Com o
+    motor "onnx" o modelo e o tokenizer vêm de SUMMARIZER_ONNX_DIR; com
+    SUMMARIZER_MODEL_PRECISION=int8 o motor "torch" usa o modelo quantizado.
+
+    Returns:
+        transformers.SummarizationPipeline: Pipeline pronto para uso
+    """
+    global _abstractive_pipeline
+    if _abstractive_pipeline is None:
+        with _abstractive_pipeline_lock:
+            if _abstractive_pipeline is None:
+                if ABSTRACTIVE_ENGINE not in ABSTRACTIVE_ENGINES:
+                    raise ValueError(f"Motor abstrativo inválido: {ABSTRACTIVE_ENGINE}. Escolha entre {', '.join(ABSTRACTIVE_ENGINES)}")
+                if MODEL_PRECISION not in MODEL_PRECISIONS:
+                    raise ValueError(f"Precisão do modelo inválida: {MODEL_PRECISION}. Escolha entre {', '.join(MODEL_PRECISIONS)}")
+
+                onnx = ABSTRACTIVE_ENGINE == "onnx"
+                source = ONNX_MODEL_DIR if onnx else ABSTRACTIVE_MODEL_DIR or ABSTRACTIVE_MODEL
+                local_only = OFFLINE_MODE or onnx or ABSTRACTIVE_MODEL_DIR is not None
+
+                if OFFLINE_MODE:
+                    # Precisa ser definido antes da importação do transformers
+                    os.environ["HF_HUB_OFFLINE"] = "1"
+                elif not local_only:
+                    _login_huggingface()
+
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+                logger.info(f"Carregando modelo abstrativo '{source}' (motor: {ABSTRACTIVE_ENGINE}, somente local: {local_only})")
+                start = time.perf_counter()
+                if onnx:
+                    if MODEL_PRECISION != "fp32":
+                        logger.warning(f"SUMMARIZER_MODEL_PRECISION={MODEL_PRECISION} é ignorado pelo motor ONNX")
+                    model = _load_onnx_model(source)
+                    model_tokenizer = None
+                elif MODEL_PRECISION == "int8":
+                    # O tokenizer vem do diretório quantizado, junto dos pesos
+                    model, model_tokenizer = _load_quantized_model(source, local_only)
+                else:
+                    model = AutoModelForSeq2SeqLM.from_pretrained(source, local_files_only=local_only)
+                    model_tokenizer = None
+                if model_tokenizer is None:
+                    model_tokenizer = AutoTokenizer.from_pretrained(source, use_fast=True, local_files_only=local_only)
+                _abstractive_pipeline = pipeline("summarization", model=model, tokenizer=model_tokenizer)
+                logger.info(f"Modelo abstrativo carregado em {time.perf_counter() - start:.1f} s")
+    return _abstractive_pipeline
+
+
+def is_abstractive_model_loaded():
+    """Indica se o modelo abstrativo já foi carregado neste processo."""
+    return _abstractive_pipeline is not None
+
+
+def get_draft_model():
+    """
+    Retorna o modelo de rascunho da geração assistida, carregando-o na primeira chamada.
+
+    A carga é tentada uma única vez. Se o modelo não existir, não for
+    compatível com o modelo principal (vocabulário diferente) ou o motor não
+    for "torch", um aviso é registrado e a geração segue sem assistência.
+
+    Returns:
+        transformers.PreTrainedModel | None: Modelo de rascunho, ou None sem geração assistida
+    """
+    global _draft_model, _draft_model_checked
+    if not DRAFT_MODEL:
+        return None
+    if not _draft_model_checked:
+        with _draft_model_lock:
+            if not _draft_model_checked:
+                _draft_model = _load_draft_model(get_abstractive_pipeline().model)
+                _draft_model_checked = True
+    return _draft_model
+
+
+def _load_draft_model(main_model):
+    if ABSTRACTIVE_ENGINE != "torch":
+        logger.warning(f"Geração assistida desativada: não é suportada pelo motor '{ABSTRACTIVE_ENGINE}'")
+        return None
+
+    from transformers import AutoModelForSeq2SeqLM
+
+    local_only = OFFLINE_MODE or os.path.isdir(DRAFT_MODEL)
+    logger.info(f"Carregando modelo de rascunho '{DRAFT_MODEL}' (somente local: {local_only})")
+    try:
+        draft_model = AutoModelForSeq2SeqLM.from_pretrained(DRAFT_MODEL, local_files_only=local_only).eval()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Geração assistida desativada: modelo de rascunho '{DRAFT_MODEL}' indisponível ({str(e)})")
+        return None
+
+    if draft_model.config.vocab_size != main_model.config.vocab_size:
+        logger.warning(
+            f"Geração assistida desativada: o vocabulário do modelo de rascunho ({draft_model.config.vocab_size}) "
+            f"difere do modelo principal ({main_model.config.vocab_size})"
+        )
+        return None
+
+    # Com o cronograma "heuristic", o número de tokens propostos cresce quando
+    # todos são aceitos e diminui quando algum é rejeitado
+    draft_model.generation_config.num_assistant_tokens = DRAFT_NUM_TOKENS
+    draft_model.generation_config.num_assistant_tokens_schedule = "heuristic"
+    logger.info(f"Geração assistida habilitada com '{DRAFT_MODEL}' ({draft_model.num_parameters() / 1e6:.1f} M parâmetros)")
+    return draft_model
+
+
+def assisted_generation_params(decoding_params):
+    """
+    Configuração da geração assistida que se aplica a uma decodificação, para compor chaves de cache.
+
+    A assistência vale com SUMMARIZER_DRAFT_MODEL no motor "torch", quando a
+    decodificação não usa busca por feixe (mesma condição de `_generate_kwargs`). Com
+    decodificação gulosa o resultado deveria ser o mesmo do modelo principal
+    sozinho, mas pode diferir numericamente, então o modelo de rascunho e o
+    número de tokens propostos fazem parte da chave.
+
+    Returns:
+        dict: Vazio quando a geração não é assistida
+    """
+    if not DRAFT_MODEL or ABSTRACTIVE_ENGINE != "torch" or decoding_params.get("num_beams", 1) != 1:
+        return {}
+    return {"draft_model": DRAFT_MODEL, "draft_tokens": DRAFT_NUM_TOKENS}
+
+
+def is_draft_model_loaded():
+    """Indica se a geração assistida está ativa neste processo."""
+    return _draft_model is not None
+
+
+def warm_up(abstractive=True):
+    """
+    Pré-carrega os recursos de sumarização antes da primeira requisição.
+
+    Args:
+        abstractive (bool): Se também deve carregar o modelo abstrativo
+    """
+    get_extractive_resources()
+    if abstractive:
+        get_abstractive_pipeline()
+        get_draft_model()
+
+
+def split_into_chunks(text, offsets, max_chunk_tokens):
+    """
+    Divide o texto em chunks de até `max_chunk_tokens` tokens a partir dos offsets.
+
+    Usa o `offset_mapping` de uma única passada do tokenizer: os limites de
+    sentença são localizados no texto e convertidos em índices de token por
+    busca binária, então nenhuma sentença é recodificada. Sentenças maiores
+    que o limite são cortadas em janelas de tokens, sem decodificação.
+
+    Args:
+        text (str): Texto original
+        offsets (list[tuple[int, int]]): Offsets (início, fim) de cada token no texto
+        max_chunk_tokens (int): Número máximo de tokens por chunk
+
+    Returns:
+        list[str]: Trechos do texto original, na ordem
+    """
+    if not offsets:
+        return []
+
+    ends = numpy.fromiter((end for _start, end in offsets), dtype=numpy.int64, count=len(offsets))
+    sentence_starts = [0] + [match.end() for match in _SENTENCE_BOUNDARY.finditer(text)]
+    # Índice do primeiro token de cada sentença (limites válidos de corte). O
+    # offset inicial de um token pode incluir o espaço anterior, por isso a
+    # busca usa o offset final
+    boundaries = numpy.unique(numpy.append(numpy.searchsorted(ends, sentence_starts, side="right"), len(offsets)))
+
+    chunks = []
+    first = 0
+    while first < len(offsets):
+        # Maior limite de sentença que cabe no chunk; sem nenhum, corta por tokens
+        k = numpy.searchsorted(boundaries, first + max_chunk_tokens, side="right") - 1
+        last = int(boundaries[k])
+        if last <= first:
+            last = min(first + max_chunk_tokens, len(offsets))
+        chunk = text[offsets[first][0]:offsets[last - 1][1]].strip()
+        if chunk:
+            chunks.append(chunk)
+        first = last
+
+    return chunks
+
+
+def group_into_windows(texts, token_counts, max_window_tokens):
+    """
+    Agrupa textos consecutivos em janelas de até `max_window_tokens` tokens.
+
+    Um texto maior que a janela fica sozinho na sua. A ordem é preservada.
+
+    Args:
+        texts (list[str]): Textos a agrupar
+        token_counts (list[int]): Número de tokens de cada texto
+        max_window_tokens (int): Número máximo de tokens por janela
+
+    Returns:
+        list[str]: Textos de cada janela, unidos por espaço
+    """
+    windows, current, size = [], [], 0
+    for text, count in zip(texts, token_counts):
+        if current and size + count > max_window_tokens:
+            windows.append(" ".join(current))
+            current, size = [], 0
+        current.append(text)
+        size += count
+    if current:
+        windows.append(" ".join(current))
+    return windows
+
+
+def _reduce_summaries(summaries, decoding_params, max_length, min_length, tokenizer, chars_per_token, on_token=None):
+    """
+    Reduz os resumos parciais recursivamente até caberem em uma entrada do modelo.
+
+    A cada nível, resumos consecutivos são agrupados em janelas que cabem na
+    entrada do modelo e cada janela é resumida (em lotes). O orçamento de
+    `max_length` (convertido em tokens) é dividido entre as janelas, limitado
+    a meia janela para que cada nível reduza de fato o texto. Quando o texto
+    combinado cabe na entrada, é feito o resumo final se ele ainda exceder
+    `max_length` caracteres (transmitido a `on_token`, se houver).
+
+    Returns:
+        str: Resumo final
+    """
+    level = 0
+    previous_tokens = None
+    while True:
+        token_counts = [len(ids) for ids in tokenizer(summaries, add_special_tokens=False)["input_ids"]]
+        if sum(token_counts) <= CHUNK_TOKENS:
+            break
+        if previous_tokens is not None and sum(token_counts) >= previous_tokens:
+            # O modelo não respeitou o orçamento de geração; evita laço infinito
+            logger.warning(f"Redução nível {level} não diminuiu o texto ({sum(token_counts)} tokens), interrompendo")
+            break
+        previous_tokens = sum(token_counts)
+
+        level += 1
+        windows = group_into_windows(summaries, token_counts, CHUNK_TOKENS)
+        window_max_tokens = min(max(50, int(max_length / chars_per_token) // len(windows)), CHUNK_TOKENS // 2)
+        window_min_tokens = min(max(10, int(min_length / chars_per_token) // len(windows)), window_max_tokens - 1)
+        logger.info(f"Redução nível {level}: {len(summaries)} resumos ({sum(token_counts)} tokens) em {len(windows)} janelas")
+        generation = dict(decoding_params, max_new_tokens=window_max_tokens, min_new_tokens=window_min_tokens)
+        summaries = _generate_summaries(windows, generation)
+
+    combined_summary = " ".join(summaries)
+    if len(combined_summary) > max_length:
+        logger.info("Fazendo resumo final do resumo combinado")
+        plan = plan_lengths(max_length, min_length, chars_per_token)
+        return _generate_final_summary(combined_summary, dict(decoding_params, **plan.generation_kwargs()), on_token)
+    return combined_summary
+
+
+def _generate_kwargs(generation, model_tokenizer):
+    """
+    Converte os parâmetros de geração em argumentos do `generate`.
+
+    O orçamento de caracteres vira critério de parada e, sem beam search, o
+    modelo de rascunho (se houver) é passado como `assistant_model`.
+    """
+    from transformers import StoppingCriteriaList
+
+    kwargs = dict(generation)
+    max_chars = kwargs.pop("max_chars", None)
+    if max_chars:
+        kwargs["stopping_criteria"] = StoppingCriteriaList([CharacterBudgetCriteria(model_tokenizer, max_chars)])
+    if kwargs.get("num_beams", 1) == 1:
+        draft_model = get_draft_model()
+        if draft_model is not None:
+            # O transformers não aceita comprimento mínimo na geração assistida
+            kwargs.pop("min_new_tokens", None)
+            kwargs["assistant_model"] = draft_model
+    return kwargs
+
+
+def _run_generation(texts, generation):
+    """
+    Executa uma única chamada em lote ao modelo abstrativo.
+
+    O pipeline devolve os ids gerados (`return_tensors=True`), decodificados
+    aqui; assim o número de tokens de cada resumo sai da própria geração,
+    sem tokenizar o texto de novo.
+
+    Returns:
+        list[tuple[str, int]]: (resumo, tokens gerados) de cada texto
+    """
+    summarizer_abstractive_pipeline = get_abstractive_pipeline()
+    model_tokenizer = summarizer_abstractive_pipeline.tokenizer
+    kwargs = _generate_kwargs(generation, model_tokenizer)
+
+    # Adicionar prefixo para T5 (importante para task de sumarização)
+    batch = [f"summarize: {text}" for text in texts]
+    # A geração assistida processa uma sequência por vez
+    batch_size = 1 if "assistant_model" in kwargs else len(batch)
+    with _generation_lock:
+        outputs = summarizer_abstractive_pipeline(batch, batch_size=batch_size, return_tensors=True, **kwargs)
+    output_ids = [output['summary_token_ids'] for output in outputs]
+    # Mesma decodificação do pipeline ao devolver o texto
+    summaries = model_tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+    return [(summary.strip(), _generated_token_count(ids, model_tokenizer)) for summary, ids in zip(summaries, output_ids)]
+
+
+def _generated_token_count(ids, model_tokenizer):
+    """Tokens gerados em uma sequência, sem o token inicial do decoder, o padding e o EOS."""
+    special = set(model_tokenizer.all_special_ids)
+    ids = ids.tolist() if hasattr(ids, "tolist") else ids
+    return sum(1 for token_id in ids if token_id not in special)
+
+
+def _run_sorted_batches(texts, generation, batch_size):
+    """
+    Resume os textos em lotes de `batch_size`, ordenados por comprimento.
+
+    Lotes com entradas de tamanho parecido têm o mínimo de padding. Os
+    resultados de `_run_generation` voltam na ordem original.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    results = [None] * len(texts)
+
+    for start in range(0, len(order), batch_size):
+        batch_ids = order[start:start + batch_size]
+        if len(texts) > 1:
+            logger.info(f"Processando lote de {len(batch_ids)} textos ({start + len(batch_ids)}/{len(texts)})")
+        outputs = _run_generation([texts[i] for i in batch_ids], generation)
+        for i, output in zip(batch_ids, outputs):
+            results[i] = output
+
+    return results
+
+
+def get_batch_scheduler():
+    """Retorna o agendador de micro-lotes do modelo abstrativo, criando-o na primeira chamada."""
+    global _batch_scheduler
+    if _batch_scheduler is None:
+        with _abstractive_pipeline_lock:
+            if _batch_scheduler is None:
+                # O lote reunido pelo agendador é dividido em chamadas de até
+                # ABSTRACTIVE_BATCH_SIZE textos, como no caminho sem micro-batching
+                _batch_scheduler = MicroBatchScheduler(
+                    lambda texts, key: _run_sorted_batches(texts, dict(key), min(ABSTRACTIVE_BATCH_SIZE, MICROBATCH_MAX_SIZE)),
+                    max_batch_size=MICROBATCH_MAX_SIZE,
+                    max_wait_ms=MICROBATCH_WAIT_MS
+                )
+    return _batch_scheduler
+
+
+def _generate_summaries(texts, generation, batch_size=None):
+    """
+    Gera os resumos de vários textos com o modelo abstrativo, em lotes.
+
+    Com o micro-batching habilitado, os textos passam pelo agendador
+    compartilhado e podem ser processados no mesmo lote que textos de outras
+    requisições concorrentes com os mesmos parâmetros; cada chamada ao modelo
+    leva até ABSTRACTIVE_BATCH_SIZE textos (e `batch_size` é ignorado, pois o
+    lote mistura chamadores). Caso contrário, são processados em lotes locais
+    de `batch_size`.
+
+    Args:
+        texts (list[str]): Textos a serem resumidos (sem o prefixo "summarize: ")
+        generation (dict): Parâmetros de geração, incluindo os limites de tokens e `max_chars` do `LengthPlan`
+        batch_size (int): Textos por chamada ao modelo (padrão: ABSTRACTIVE_BATCH_SIZE)
+
+    Returns:
+        list[str]: Resumos na mesma ordem de `texts`
+    """
+    if MICROBATCH_ENABLED:
+        outputs = get_batch_scheduler().run(texts, tuple(sorted(generation.items())))
+    else:
+        outputs = _run_sorted_batches(texts, generation, batch_size or ABSTRACTIVE_BATCH_SIZE)
+    # Contado na thread de quem chamou, para entrar no trace da requisição
+    OUTPUT_TOKENS.inc(sum(count for _summary, count in outputs))
+    return [summary for summary, _count in outputs]
+
+
+def _generate_final_summary(text, generation, on_token=None):
+    """
+    Gera o resumo de um único texto, a última geração de uma sumarização.
+
+    Com `on_token`, o texto é gerado por `_stream_generation` e
+    `on_token(text)` é chamado com cada trecho assim que é decodificado.
+    """
+    if on_token is None:
+        return _generate_summaries([text], generation)[0]
+
+    pieces = []
+    for piece in _stream_generation(text, generation):
+        pieces.append(piece)
+        on_token(piece)
+    return "".join(pieces)
+
+
+def select_sentences_within_tokens(ranked, token_counts, max_tokens):
+    """
+    Escolhe as sentenças mais bem pontuadas que cabem em `max_tokens` tokens do modelo.
+
+    Percorre o ranking em ordem de pontuação e pula as sentenças que não
+    cabem mais no orçamento restante.
+
+    Args:
+        ranked (list[RankedSentence]): Ranking retornado por `rank_sentences`
+        token_counts (list[int]): Número de tokens de cada sentença, na ordem de `ranked`
+        max_tokens (int): Orçamento de tokens do trecho selecionado
+
+    Returns:
+        list[RankedSentence]: Sentenças escolhidas na ordem do documento
+    """
+    selected = []
+    remaining = max_tokens
+    for i in sorted(range(len(ranked)), key=lambda i: ranked[i].score, reverse=True):
+        if token_counts[i] <= remaining:
+            selected.append(ranked[i])
+            remaining -= token_counts[i]
+        if remaining <= 0:
+            break
+    return sorted(selected, key=lambda s: s.order)
+
+
+def summarize_hybrid(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAULT_MIN_LENGTH, decoding=None, num_beams=None):
+    """
+    Gera um resumo abstrativo a partir de uma pré-seleção extrativa do texto.
+
+    O ranking LSA (motor HYBRID_EXTRACTIVE_ENGINE) mantém as sentenças mais
+    relevantes até caberem em uma entrada do modelo; o resumo é gerado com
+    uma única chamada ao modelo, independentemente do tamanho do documento.
+
+    Args:
+        text (str): Texto a ser resumido
+        max_length (int): Comprimento máximo do resumo em caracteres
+        min_length (int): Comprimento mínimo do resumo em caracteres
+        decoding (str): Perfil de decodificação - 'greedy', 'beam' ou 'sampling' (padrão: DEFAULT_DECODING_PROFILE)
+        num_beams (int): Largura do beam search para o perfil 'beam'
+
+    Returns:
+        str: Resumo abstrativo do texto
+    """
+    logger.info(f"Iniciando sumarização híbrida. Texto length: {len(text)}, max_length: {max_length}, min_length: {min_length}, decoding: {decoding or DEFAULT_DECODING_PROFILE}")
+
+    try:
+        if max_length <= min_length:
+            raise ValueError("max_length deve ser maior que min_length")
+        decoding_params = resolve_decoding(decoding, num_beams)
+
+        tokenizer = get_abstractive_pipeline().tokenizer
+        ranked = rank_sentences(text, LANGUAGE, HYBRID_EXTRACTIVE_ENGINE)
+        if not ranked:
+            return ""
+
+        with stage_timer("tokenization"):
+            token_counts = [len(ids) for ids in tokenizer([s.text for s in ranked], add_special_tokens=False)["input_ids"]]
+        INPUT_TOKENS.inc(sum(token_counts))
+        selected = select_sentences_within_tokens(ranked, token_counts, HYBRID_INPUT_TOKENS)
+        if selected:
+            compressed = " ".join(s.text for s in selected)
+        else:
+            # Nenhuma sentença cabe sozinha no orçamento: usa o início da mais relevante
+            best = max(ranked, key=lambda s: s.score).text
+            offsets = tokenizer(best, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+            compressed = split_into_chunks(best, offsets, HYBRID_INPUT_TOKENS)[0]
+        logger.info(f"Pré-seleção extrativa: {len(selected)} de {len(ranked)} sentenças "
+                    f"({sum(token_counts[s.order] for s in selected)} de {sum(token_counts)} tokens)")
+
+        chars_per_token = estimate_chars_per_token(compressed, sum(token_counts[s.order] for s in selected) or HYBRID_INPUT_TOKENS)
+        plan = plan_lengths(max_length, min_length, chars_per_token)
+        with stage_timer("generation"):
+            result = _generate_summaries([compressed], dict(decoding_params, **plan.generation_kwargs()))[0]
+        result = _clip_summary(result, max_length, min_length)
+        logger.info(f"Resumo híbrido gerado. Length: {len(result)} caracteres")
+        return result
+
+    except Exception as e:
+        logger.error(f"Erro na sumarização híbrida: {str(e)}")
+        raise
+
+
+def rank_chunks(chunks, language=LANGUAGE):
+    """
+    Relevância LSA de cada chunk em relação ao documento, tratando cada chunk como uma sentença.
+
+    Returns:
+        list[float]: Pontuação de cada chunk (vazia se não houver termos)
+    """
+    resources = get_extractive_resources(language)
+    document = ObjectDocumentModel([Paragraph([Sentence(chunk, resources.tokenizer) for chunk in chunks])])
+    return [float(score) for score in _rank_sparse(document, resources.summarizer)]
+
+
+def _chunk_generations(chunks, decoding_params, max_length, min_length, chars_per_token):
+    """
+    Parâmetros de geração de cada chunk, com o orçamento de caracteres distribuído entre eles.
+
+    No modo "proportional", cada chunk recebe uma parte de `max_length`
+    proporcional ao seu tamanho, ponderado pela relevância LSA, e os resumos
+    somados já cabem no resumo final. Se o orçamento não comporta um resumo
+    útil por chunk (ou no modo "uniform"), todos recebem a mesma parte, com
+    um mínimo, e a redução hierárquica ajusta o resultado.
+
+    Returns:
+        list[dict]: Parâmetros de geração na ordem dos chunks
+    """
+    budgets = None
+    if CHUNK_BUDGET_MODE == "proportional":
+        scores = rank_chunks(chunks)
+        mean_score = sum(scores) / len(scores) if scores else 0.0
+        weights = [
+            len(chunk) * (1 - CHUNK_SALIENCE_WEIGHT + CHUNK_SALIENCE_WEIGHT * (scores[i] / mean_score if mean_score else 1.0))
+            for i, chunk in enumerate(chunks)
+        ]
+        budgets = allocate_chunk_budgets(weights, max_length)
+
+    if budgets is None:
+        plan = plan_lengths(max(200, max_length // len(chunks)), max(40, min_length // len(chunks)), chars_per_token)
+        return [dict(decoding_params, **plan.generation_kwargs())] * len(chunks)
+
+    logger.info(f"Orçamento distribuído entre os chunks: {budgets} caracteres")
+    return [
+        dict(decoding_params, **plan_lengths(budget, min_length * budget // max_length, chars_per_token).generation_kwargs())
+        for budget in budgets
+    ]
 
-def summarize_abstractive(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAULT_MIN_LENGTH):
+
+def _summarize_chunks(chunks, generations, completed_chunks=None, on_chunk=None):
+    """
+    Resume os chunks, cada um com seus parâmetros de geração.
+
+    Chunks com os mesmos parâmetros são enviados juntos, em lotes. Cada
+    resumo é ajustado ao seu orçamento de caracteres, para que a soma caiba
+    no orçamento total. Os resumos voltam na ordem dos chunks.
+
+    Os chunks presentes em `completed_chunks` (índice -> resumo) não são
+    gerados de novo. Com `on_chunk`, os chunks são enviados em lotes de
+    ABSTRACTIVE_BATCH_SIZE e `on_chunk(index, total, summary)` é chamado
+    assim que cada lote termina.
+    """
+    completed_chunks = completed_chunks or {}
+    summaries = [completed_chunks.get(i) for i in range(len(chunks))]
+    groups = {}
+    for i, generation in enumerate(generations):
+        if summaries[i] is None:
+            groups.setdefault(tuple(sorted(generation.items())), []).append(i)
+
+    for key, indices in groups.items():
+        generation = dict(key)
+        step = ABSTRACTIVE_BATCH_SIZE if on_chunk is not None else len(indices)
+        for start in range(0, len(indices), step):
+            batch = indices[start:start + step]
+            batch_start = time.perf_counter()
+            batch_summaries = _generate_summaries([chunks[i] for i in batch], generation)
+            # Chunks gerados juntos dividem a duração do lote
+            per_chunk = (time.perf_counter() - batch_start) / len(batch)
+            CHUNKS.inc(len(batch))
+            for i, summary in zip(batch, batch_summaries):
+                STAGE_SECONDS.observe(per_chunk, "chunk_generation")
+                summaries[i] = fit_to_budget(summary, generation["max_chars"])
+                if on_chunk is not None:
+                    on_chunk(i, len(chunks), summaries[i])
+    return summaries
+
+
+def _clip_summary(result, max_length, min_length):
+    """Validação final do comprimento do resumo."""
+    result = fit_to_budget(result, max_length)
+    if len(result) < min_length:
+        logger.warning(f"Resumo final muito curto: {len(result)} caracteres")
+    return result
+
+
+def summarize_abstractive(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAULT_MIN_LENGTH, decoding=None, num_beams=None,
+                          completed_chunks=None, on_chunk=None, on_token=None):
     """
     Gera um resumo abstrativo do texto usando modelo de linguagem T5.
 
     Args:
         text (str): Texto a ser resumido
-        max_length (int): Comprimento máximo do resumo em tokens
-        min_length (int): Comprimento mínimo do resumo em tokens
+        max_length (int): Comprimento máximo do resumo em caracteres
+        min_length (int): Comprimento mínimo do resumo em caracteres
+        decoding (str): Perfil de decodificação - 'greedy', 'beam' ou 'sampling' (padrão: DEFAULT_DECODING_PROFILE)
+        num_beams (int): Largura do beam search para o perfil 'beam'
+        completed_chunks (dict[int, str]): Resumos de chunks de uma execução anterior com o mesmo
+            texto e a mesma configuração, que não são gerados de novo (textos longos)
+        on_chunk (callable): `on_chunk(index, total, summary)`, chamado a cada chunk resumido (textos longos)
+        on_token (callable): `on_token(text)`, chamado com cada trecho decodificado da última geração:
+            o resumo de um texto curto ou o resumo final de um texto longo
 
     Returns:
         str: Resumo abstrativo do texto
     """
-    logger.info(f"Iniciando sumarização abstrativa. Texto length: {len(text)}, max_length: {max_length}, min_length: {min_length}")
+    logger.info(f"Iniciando sumarização abstrativa. Texto length: {len(text)}, max_length: {max_length}, min_length: {min_length}, decoding: {decoding or DEFAULT_DECODING_PROFILE}")
 
     try:
         # Validar parâmetros
@@ -108,143 +1189,230 @@ def summarize_abstractive(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAUL
             logger.warning(f"max_length ({max_length}) muito alto, pode afetar performance")
         if min_length < 10:
             logger.warning(f"min_length ({min_length}) muito baixo, resumo pode ser muito curto")
+        decoding_params = resolve_decoding(decoding, num_beams)
+
+        tokenizer = get_abstractive_pipeline().tokenizer
 
-        max_input_length = 512  # Limite do modelo mT5
-        tokens = tokenizer.encode(text, add_special_tokens=True)
+        # Tokenização única do texto; os offsets definem os limites dos chunks
+        # sem precisar recodificar sentenças ou decodificar tokens
+        with stage_timer("tokenization"):
+            offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        INPUT_TOKENS.inc(len(offsets))
+        tokens_count = len(offsets) + tokenizer.num_special_tokens_to_add()
+        # Os comprimentos são em caracteres; a geração é limitada em tokens
+        chars_per_token = estimate_chars_per_token(text, len(offsets))
 
-        if len(tokens) <= max_input_length:
+        if tokens_count <= MAX_INPUT_TOKENS:
             # Texto curto - processar diretamente
             logger.info("Processando texto curto diretamente")
 
-            # Adicionar prefixo para T5 (importante para task de sumarização)
-            input_text = f"summarize: {text}"
-
-            summary = summarizer_abstractive_pipeline(
-                input_text,
-                max_length=max_length,
-                min_length=min_length,
-                do_sample=True,  # Habilitar sampling para mais diversidade
-                temperature=0.3,  # Baixa temperatura para consistência
-                top_p=0.9,  # Nucleus sampling
-                top_k=50,  # Top-k sampling
-                num_beams=4,  # Beam search para qualidade
-                early_stopping=True,
-                no_repeat_ngram_size=3,  # Evitar repetições
-                length_penalty=1.0,  # Penalidade de comprimento
-                repetition_penalty=1.2  # Penalizar repetições
-            )
-
-            result = summary[0]['summary_text'].strip()
+            plan = plan_lengths(max_length, min_length, chars_per_token)
+            with stage_timer("generation"):
+                result = _generate_final_summary(text, dict(decoding_params, **plan.generation_kwargs()), on_token)
+            result = _clip_summary(result, max_length, min_length)
             logger.info(f"Resumo abstrativo gerado. Length: {len(result)} caracteres")
             return result
 
         else:
             # Texto longo - dividir em chunks
-            logger.info(f"Texto longo detectado ({len(tokens)} tokens). Dividindo em chunks.")
-
-            # Estratégia melhorada de chunking: dividir por sentenças quando possível
-            chunks = []
-            current_chunk_tokens = []
-            current_length = 0
-
-            # Tentar dividir por sentenças primeiro
-            sentences = text.split('. ')
-            current_chunk_text = ""
-
-            for sentence in sentences:
-                sentence_tokens = tokenizer.encode(sentence + ". ", add_special_tokens=False)
-                if current_length + len(sentence_tokens) <= max_input_length - 50:  # Margem de segurança
-                    current_chunk_text += sentence + ". "
-                    current_length += len(sentence_tokens)
-                else:
-                    if current_chunk_text:
-                        chunks.append(current_chunk_text.strip())
-                    current_chunk_text = sentence + ". "
-                    current_length = len(sentence_tokens)
-
-            if current_chunk_text:
-                chunks.append(current_chunk_text.strip())
-
-            # Fallback para chunking por tokens se necessário
-            if not chunks:
-                logger.warning("Divisão por sentenças falhou, usando chunking por tokens")
-                current_chunk = []
-                current_length = 0
-                for token in tokens:
-                    current_chunk.append(token)
-                    current_length += 1
-                    if current_length >= max_input_length - 50:
-                        chunks.append(tokenizer.decode(current_chunk, skip_special_tokens=True))
-                        current_chunk = []
-                        current_length = 0
-                if current_chunk:
-                    chunks.append(tokenizer.decode(current_chunk, skip_special_tokens=True))
+            logger.info(f"Texto longo detectado ({tokens_count} tokens). Dividindo em chunks.")
 
+            with stage_timer("chunking"):
+                chunks = split_into_chunks(text, offsets, CHUNK_TOKENS)
             logger.info(f"Texto dividido em {len(chunks)} chunks")
+            if completed_chunks:
+                logger.info(f"Retomando: {len(completed_chunks)} de {len(chunks)} chunks já resumidos")
 
-            # Summarizar cada chunk
-            summaries = []
-            chunk_max_length = max(50, max_length // len(chunks))  # Distribuir comprimento entre chunks
-
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Processando chunk {i+1}/{len(chunks)}")
-
-                input_text = f"summarize: {chunk}"
-
-                summary = summarizer_abstractive_pipeline(
-                    input_text,
-                    max_length=chunk_max_length,
-                    min_length=max(10, min_length // len(chunks)),
-                    do_sample=True,
-                    temperature=0.3,
-                    top_p=0.9,
-                    top_k=50,
-                    num_beams=4,
-                    early_stopping=True,
-                    no_repeat_ngram_size=3,
-                    length_penalty=1.0,
-                    repetition_penalty=1.2
-                )
-
-                summaries.append(summary[0]['summary_text'].strip())
-
-            # Combinar resumos dos chunks
-            combined_summary = " ".join(summaries)
-
-            # Se o resumo combinado for muito longo, fazer um resumo final
-            combined_tokens = tokenizer.encode(combined_summary, add_special_tokens=False)
-            if len(combined_tokens) > max_length:
-                logger.info("Fazendo resumo final do resumo combinado")
-
-                final_input = f"summarize: {combined_summary}"
-                final_summary = summarizer_abstractive_pipeline(
-                    final_input,
-                    max_length=max_length,
-                    min_length=min_length,
-                    do_sample=True,
-                    temperature=0.3,
-                    top_p=0.9,
-                    top_k=50,
-                    num_beams=4,
-                    early_stopping=True,
-                    no_repeat_ngram_size=3,
-                    length_penalty=1.0,
-                    repetition_penalty=1.2
-                )
+            # Summarizar todos os chunks em lotes
+            generations = _chunk_generations(chunks, decoding_params, max_length, min_length, chars_per_token)
+            summaries = _summarize_chunks(chunks, generations, completed_chunks, on_chunk)
 
-                result = final_summary[0]['summary_text'].strip()
-            else:
-                result = combined_summary
+            # Combinar os resumos dos chunks, reduzindo-os em níveis enquanto
+            # não couberem na entrada do modelo
+            with stage_timer("reduce"):
+                result = _reduce_summaries(summaries, decoding_params, max_length, min_length, tokenizer, chars_per_token, on_token)
 
-            # Validação final do comprimento
-            if len(result) > max_length * 2:  # Permitir alguma flexibilidade
-                result = result[:max_length * 2].rsplit(' ', 1)[0] + "..."
-            elif len(result) < min_length:
-                logger.warning(f"Resumo final muito curto: {len(result)} caracteres")
+            result = _clip_summary(result, max_length, min_length)
 
             logger.info(f"Resumo abstrativo final gerado. Length: {len(result)} caracteres, chunks processados: {len(chunks)}")
             return result
 
     except Exception as e:
         logger.error(f"Erro na sumarização abstrativa: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+
+def summarize_abstractive_batch(items):
+    """
+    Resume vários textos com o modelo abstrativo, agrupando as gerações em lotes.
+
+    Textos curtos com os mesmos parâmetros de geração são enviados juntos ao
+    modelo (pelo agendador de micro-lotes, quando habilitado, compartilhado
+    com as requisições individuais). Textos longos e itens do método híbrido
+    seguem o caminho de um texto por vez, com os chunks também em lotes. A
+    falha de um item não interrompe os demais.
+
+    Os parâmetros de cada item são validados antes do agrupamento, como em
+    `summarize_abstractive`; um item inválido recebe o próprio ValueError
+    como erro, para que a API o distinga de uma falha na geração.
+
+    Args:
+        items (list[tuple]): (método, texto, max_length, min_length, decoding, num_beams) de
+            cada item, com método 'abstractive' ou 'hybrid'
+
+    Returns:
+        list[tuple[str | None, str | ValueError | None]]: (resumo, erro) de cada item, na ordem de `items`
+    """
+    tokenizer = get_abstractive_pipeline().tokenizer
+    results = [None] * len(items)
+    groups = {}
+    single = []
+
+    for i, (method, text, max_length, min_length, decoding, num_beams) in enumerate(items):
+        try:
+            if max_length <= min_length:
+                raise ValueError("max_length deve ser maior que min_length")
+            decoding_params = resolve_decoding(decoding, num_beams)
+        except ValueError as e:
+            results[i] = (None, e)
+            continue
+        if method != "abstractive":
+            single.append(i)
+            continue
+        try:
+            with stage_timer("tokenization"):
+                tokens_count = len(tokenizer(text, add_special_tokens=False)["input_ids"])
+        except Exception as e:
+            results[i] = (None, str(e))
+            continue
+        if tokens_count + tokenizer.num_special_tokens_to_add() > MAX_INPUT_TOKENS:
+            single.append(i)
+            continue
+        INPUT_TOKENS.inc(tokens_count)
+        plan = plan_lengths(max_length, min_length, estimate_chars_per_token(text, tokens_count))
+        generation = dict(decoding_params, **plan.generation_kwargs())
+        groups.setdefault(tuple(sorted(generation.items())), []).append(i)
+
+    logger.info(f"Lote abstrativo: {len(items) - len(single)} textos curtos em {len(groups)} grupos de geração, "
+                f"{len(single)} processados individualmente")
+    for key, indices in groups.items():
+        try:
+            group_start = time.perf_counter()
+            summaries = _generate_summaries([items[i][1] for i in indices], dict(key))
+            per_item = (time.perf_counter() - group_start) / len(indices)
+            for _ in indices:
+                STAGE_SECONDS.observe(per_item, "generation")
+        except Exception as e:
+            logger.error(f"Erro na sumarização abstrativa em lote: {str(e)}")
+            for i in indices:
+                results[i] = (None, str(e))
+            continue
+        for i, summary in zip(indices, summaries):
+            results[i] = (_clip_summary(summary, items[i][2], items[i][3]), None)
+
+    for i in single:
+        method, text, max_length, min_length, decoding, num_beams = items[i]
+        summarize = summarize_hybrid if method == "hybrid" else summarize_abstractive
+        try:
+            results[i] = (summarize(text, max_length, min_length, decoding, num_beams), None)
+        except Exception as e:
+            results[i] = (None, str(e))
+    return results
+
+
+def _stream_generation(text, generation):
+    """
+    Gera o resumo de um texto curto devolvendo os trechos de texto à medida que são decodificados.
+
+    O `TextIteratorStreamer` não suporta busca por feixe: com `num_beams > 1`
+    (perfis "beam" e "sampling", o padrão) o resumo é gerado normalmente e
+    devolvido de uma vez. Só o perfil "greedy" transmite token a token.
+    """
+    if generation.get("num_beams", 1) > 1:
+        yield _generate_summaries([text], generation)[0]
+        return
+
+    from transformers import TextIteratorStreamer
+
+    summarizer_abstractive_pipeline = get_abstractive_pipeline()
+    model_tokenizer = summarizer_abstractive_pipeline.tokenizer
+    inputs = model_tokenizer(f"summarize: {text}", return_tensors="pt")
+    kwargs = _generate_kwargs(generation, model_tokenizer)
+    streamer = TextIteratorStreamer(model_tokenizer, skip_special_tokens=True)
+    errors = []
+    output_ids = []
+
+    def generate():
+        try:
+            with _generation_lock:
+                output_ids.extend(summarizer_abstractive_pipeline.model.generate(**inputs, streamer=streamer, **kwargs))
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=generate, name="abstractive-stream", daemon=True)
+    thread.start()
+    for piece in streamer:
+        if piece:
+            yield piece
+    thread.join()
+    if errors:
+        raise errors[0]
+    OUTPUT_TOKENS.inc(sum(_generated_token_count(ids, model_tokenizer) for ids in output_ids))
+
+
+def stream_abstractive(text, max_length=DEFAULT_MAX_LENGTH, min_length=DEFAULT_MIN_LENGTH, decoding=None, num_beams=None):
+    """
+    Versão incremental de `summarize_abstractive`, que produz eventos à medida que o resumo é gerado.
+
+    Executa `summarize_abstractive` em uma thread e repassa os seus callbacks
+    como eventos: "chunk" a cada chunk resumido de um texto longo e "token"
+    com cada trecho decodificado da última geração (o resumo de um texto
+    curto ou o resumo final de um texto longo, quando há um). Os trechos só
+    chegam um a um com o perfil "greedy"; nos perfis com busca por feixe a
+    última geração vem em um único evento "token". O último evento é
+    "summary", com o resumo final, o tempo até o primeiro evento (`ttft_ms`)
+    e o tempo total (`total_ms`).
+
+    Args:
+        text (str): Texto a ser resumido
+        max_length (int): Comprimento máximo do resumo em caracteres
+        min_length (int): Comprimento mínimo do resumo em caracteres
+        decoding (str): Perfil de decodificação - 'greedy', 'beam' ou 'sampling' (padrão: DEFAULT_DECODING_PROFILE)
+        num_beams (int): Largura do beam search para o perfil 'beam'
+
+    Yields:
+        dict: Evento com a chave "event" ("token", "chunk" ou "summary") e seus dados
+    """
+    logger.info(f"Iniciando sumarização abstrativa em streaming. Texto length: {len(text)}, max_length: {max_length}, min_length: {min_length}, decoding: {decoding or DEFAULT_DECODING_PROFILE}")
+    start = time.perf_counter()
+    ttft = None
+    events = queue.Queue()
+
+    def run():
+        try:
+            result = summarize_abstractive(
+                text, max_length, min_length, decoding, num_beams,
+                on_chunk=lambda index, total, summary: events.put({"event": "chunk", "index": index, "total": total, "summary": summary}),
+                on_token=lambda piece: events.put({"event": "token", "text": piece})
+            )
+        except Exception as e:
+            events.put(e)
+        else:
+            events.put({"event": "summary", "summary": result})
+
+    threading.Thread(target=run, name="abstractive-stream-producer", daemon=True).start()
+    while True:
+        event = events.get()
+        if isinstance(event, Exception):
+            raise event
+        if event["event"] == "summary":
+            break
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        yield event
+
+    total = time.perf_counter() - start
+    ttft = total if ttft is None else ttft
+    logger.info(f"Resumo em streaming concluído. TTFT: {ttft * 1000:.0f} ms, total: {total * 1000:.0f} ms")
+    yield dict(event, ttft_ms=ttft * 1000, total_ms=total * 1000)
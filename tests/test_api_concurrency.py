@@ -0,0 +1,124 @@
+# tests/test_api_concurrency.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+import main
+from executors import BoundedExecutor, ExecutorBusyError
+
+LONG_SUMMARY_SECONDS = 1.0  # Duração simulada de cada sumarização longa
+HEALTH_MAX_SECONDS = 0.25   # Latência máxima aceita em /health durante a carga
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Aplicação sem cache nem controle de admissão, com um pool abstrativo próprio."""
+    monkeypatch.setattr(main, "summary_cache", None)
+    monkeypatch.setattr(main, "admission_controller", None)
+
+    def use_executor(max_workers, queue_size):
+        executor = BoundedExecutor(
+            "abstractive-test",
+            lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix="abstractive-test"),
+            max_workers,
+            queue_size,
+        )
+        monkeypatch.setattr(main, "abstractive_executor", executor)
+        executors.append(executor)
+        return executor
+
+    executors = []
+    yield use_executor
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+def _client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+
+
+def _payload(i):
+    return {"text": f"Texto longo número {i}. " * 50, "method": "abstractive", "decoding": "greedy"}
+
+
+@pytest.mark.anyio
+async def test_health_stays_responsive_during_long_summaries(api, monkeypatch):
+    api(max_workers=4, queue_size=4)
+
+    def slow_summary(text, *args):
+        time.sleep(LONG_SUMMARY_SECONDS)  # Trabalho bloqueante, como a geração do modelo
+        return "resumo"
+
+    monkeypatch.setattr(main, "summarize_abstractive", slow_summary)
+
+    async with _client() as client:
+        summaries = [asyncio.create_task(client.post("/summarize", json=_payload(i))) for i in range(4)]
+        await asyncio.sleep(0.1)
+
+        latencies = []
+        for _ in range(5):
+            start = time.perf_counter()
+            response = await client.get("/health")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+        assert not any(task.done() for task in summaries)
+
+        responses = await asyncio.gather(*summaries)
+
+    assert max(latencies) < HEALTH_MAX_SECONDS
+    assert [response.status_code for response in responses] == [200] * 4
+
+
+@pytest.mark.anyio
+async def test_full_executor_returns_503(api, monkeypatch):
+    api(max_workers=1, queue_size=0)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_summary(text, *args):
+        started.set()
+        release.wait(5)
+        return "resumo"
+
+    monkeypatch.setattr(main, "summarize_abstractive", blocking_summary)
+
+    async with _client() as client:
+        first = asyncio.create_task(client.post("/summarize", json=_payload(0)))
+        assert await asyncio.to_thread(started.wait, 5)
+
+        busy = await client.post("/summarize", json=_payload(1))
+        release.set()
+        done = await first
+
+    assert busy.status_code == 503
+    assert done.status_code == 200
+
+
+def test_bounded_executor_rejects_over_capacity():
+    executor = BoundedExecutor("test", lambda workers: ThreadPoolExecutor(max_workers=workers), 1, 1)
+    release = threading.Event()
+    try:
+        futures = [executor.submit(release.wait, 5) for _ in range(2)]
+        with pytest.raises(ExecutorBusyError):
+            executor.submit(release.wait, 5)
+        assert executor.in_flight == 2
+
+        release.set()
+        for future in futures:
+            future.result(5)
+        # A vaga é liberada no callback do futuro, logo depois do resultado
+        deadline = time.monotonic() + 5
+        while executor.in_flight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        executor.submit(lambda: None).result(5)
+    finally:
+        release.set()
+        executor.shutdown()
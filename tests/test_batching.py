@@ -0,0 +1,94 @@
+# tests/test_batching.py
+from types import SimpleNamespace
+
+import pytest
+
+import metrics
+import summarizer
+from metrics import OUTPUT_TOKENS
+
+
+@pytest.fixture
+def generation_calls(monkeypatch):
+    """Substitui o modelo por um gerador falso que registra o tamanho de cada chamada."""
+    calls = []
+
+    def fake_run_generation(texts, generation):
+        calls.append(len(texts))
+        return [(f"resumo de {text}", len(text.split())) for text in texts]
+
+    monkeypatch.setattr(summarizer, "_run_generation", fake_run_generation)
+    monkeypatch.setattr(summarizer, "_batch_scheduler", None)
+    yield calls
+    if summarizer._batch_scheduler is not None:
+        summarizer._batch_scheduler.shutdown()
+
+
+@pytest.mark.parametrize("microbatch", [True, False])
+def test_model_calls_honour_abstractive_batch_size(generation_calls, monkeypatch, microbatch):
+    monkeypatch.setattr(summarizer, "MICROBATCH_ENABLED", microbatch)
+    monkeypatch.setattr(summarizer, "ABSTRACTIVE_BATCH_SIZE", 3)
+    texts = [f"chunk {i}" for i in range(8)]
+
+    summaries = summarizer._generate_summaries(texts, {"num_beams": 1})
+
+    assert summaries == [f"resumo de {text}" for text in texts]
+    assert max(generation_calls) <= 3
+    assert sum(generation_calls) == len(texts)
+
+
+class _WordTokenizer:
+    """Tokenizador falso: um token por palavra."""
+
+    def __call__(self, text, add_special_tokens=True):
+        return {"input_ids": list(range(len(text.split())))}
+
+    def num_special_tokens_to_add(self):
+        return 1
+
+
+def test_batch_rejects_invalid_lengths_before_grouping(generation_calls, monkeypatch):
+    monkeypatch.setattr(summarizer, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(summarizer, "get_abstractive_pipeline", lambda: SimpleNamespace(tokenizer=_WordTokenizer()))
+    items = [
+        ("abstractive", "Um texto curto e válido.", 200, 40, "greedy", None),
+        ("abstractive", "Um texto curto com limites invertidos.", 40, 200, "greedy", None),
+    ]
+
+    (summary, error), (invalid_summary, invalid_error) = summarizer.summarize_abstractive_batch(items)
+
+    assert summary and error is None
+    assert invalid_summary is None
+    assert isinstance(invalid_error, ValueError)
+    assert str(invalid_error) == "max_length deve ser maior que min_length"
+    assert sum(generation_calls) == 1
+
+
+class _FakePipeline:
+    """Pipeline falso que devolve ids: 0 é o início do decoder e 1 o EOS."""
+
+    def __init__(self, output_ids):
+        self.tokenizer = SimpleNamespace(
+            all_special_ids=[0, 1],
+            batch_decode=lambda ids, **kwargs: [" ".join(f"t{i}" for i in row if i > 1) for row in ids],
+        )
+        self._output_ids = output_ids
+        self.calls = []
+
+    def __call__(self, batch, **kwargs):
+        self.calls.append(kwargs)
+        return [{"summary_token_ids": ids} for ids in self._output_ids]
+
+
+def test_output_tokens_come_from_generated_ids(monkeypatch):
+    pipeline = _FakePipeline([[0, 5, 6, 7, 1], [0, 8, 1, 1, 1]])
+    monkeypatch.setattr(summarizer, "get_abstractive_pipeline", lambda: pipeline)
+    monkeypatch.setattr(summarizer, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", True)
+    before = OUTPUT_TOKENS._values.get((), 0)
+
+    summaries = summarizer._generate_summaries(["primeiro", "segundo"], {"num_beams": 2})
+
+    assert summaries == ["t5 t6 t7", "t8"]
+    assert pipeline.calls[0]["return_tensors"] is True
+    assert OUTPUT_TOKENS._values.get((), 0) - before == 4
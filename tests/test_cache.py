@@ -0,0 +1,34 @@
+# tests/test_cache.py
+import httpx
+import pytest
+
+import main
+from cache import DiskCache, SummaryCache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_disk_cache_overwrite_keeps_size(tmp_path):
+    disk = DiskCache(str(tmp_path), ttl=3600, max_bytes=2**20)
+
+    for _ in range(5):
+        disk.set("chave", "o mesmo resumo")
+
+    assert disk._size == disk._scan_size()
+
+
+@pytest.mark.anyio
+async def test_metrics_exports_cache_hit_ratio(monkeypatch):
+    cache = SummaryCache()
+    cache.set("chave", "resumo")
+    cache.get("chave")
+    cache.get("ausente")
+    monkeypatch.setattr(main, "summary_cache", cache)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert "summarizer_cache_hit_ratio 0.5" in response.text
@@ -0,0 +1,29 @@
+# tests/test_cache_key.py
+import main
+import summarizer
+
+
+def _payload(**fields):
+    return main.TextInput(text="Um texto qualquer para resumir.", method="abstractive", **fields)
+
+
+def test_draft_model_changes_greedy_key(monkeypatch):
+    without_draft = main._cache_key(_payload(decoding="greedy"))
+    monkeypatch.setattr(summarizer, "DRAFT_MODEL", "models/draft")
+
+    assert main._cache_key(_payload(decoding="greedy")) != without_draft
+
+
+def test_draft_model_does_not_change_beam_key(monkeypatch):
+    without_draft = main._cache_key(_payload(decoding="beam"))
+    monkeypatch.setattr(summarizer, "DRAFT_MODEL", "models/draft")
+
+    assert main._cache_key(_payload(decoding="beam")) == without_draft
+
+
+def test_draft_tokens_change_greedy_key(monkeypatch):
+    monkeypatch.setattr(summarizer, "DRAFT_MODEL", "models/draft")
+    five_tokens = main._cache_key(_payload(decoding="greedy"))
+    monkeypatch.setattr(summarizer, "DRAFT_NUM_TOKENS", 10)
+
+    assert main._cache_key(_payload(decoding="greedy")) != five_tokens
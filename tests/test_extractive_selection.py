@@ -0,0 +1,93 @@
+# tests/test_extractive_selection.py
+import itertools
+import random
+
+import pytest
+
+import summarizer
+from summarizer import RankedSentence, select_sentences_within_budget
+
+
+def _joined_length(sentences):
+    return len(" ".join(s.text for s in sentences))
+
+
+def _random_ranking(rng, count):
+    return [
+        RankedSentence("x" * rng.randint(5, 60) + ".", order, rng.random())
+        for order in range(count)
+    ]
+
+
+def _brute_force_score(ranked, max_length, min_length):
+    """Maior pontuação possível, com a mesma preferência por atingir o min_length."""
+    best_reaching, best_fitting = None, None
+    for size in range(1, len(ranked) + 1):
+        for subset in itertools.combinations(ranked, size):
+            length = _joined_length(subset)
+            if length > max_length:
+                continue
+            score = sum(s.score for s in subset)
+            best_fitting = score if best_fitting is None else max(best_fitting, score)
+            if length >= min_length:
+                best_reaching = score if best_reaching is None else max(best_reaching, score)
+    if best_reaching is not None:
+        return best_reaching
+    return best_fitting or 0.0
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_brute_force_on_small_inputs(seed):
+    rng = random.Random(seed)
+    ranked = _random_ranking(rng, rng.randint(1, 8))
+    max_length = rng.randint(20, 200)
+    min_length = rng.randint(0, max_length - 1)
+
+    selected = select_sentences_within_budget(ranked, max_length, min_length)
+
+    assert sum(s.score for s in selected) == pytest.approx(_brute_force_score(ranked, max_length, min_length))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_never_exceeds_budget(seed):
+    rng = random.Random(1000 + seed)
+    ranked = _random_ranking(rng, rng.randint(1, 40))
+    max_length = rng.randint(10, 400)
+
+    selected = select_sentences_within_budget(ranked, max_length, min_length=max_length // 2)
+
+    assert _joined_length(selected) <= max_length
+
+
+def test_returns_sentences_in_document_order():
+    ranked = [
+        RankedSentence("Primeira sentença.", 0, 0.1),
+        RankedSentence("Segunda sentença.", 1, 0.9),
+        RankedSentence("Terceira sentença.", 2, 0.5),
+        RankedSentence("Quarta sentença.", 3, 0.7),
+    ]
+
+    selected = select_sentences_within_budget(ranked, max_length=60)
+
+    assert [s.order for s in selected] == sorted(s.order for s in selected)
+    assert [s.order for s in selected] == [1, 2, 3]
+
+
+def test_no_sentence_fits():
+    ranked = [RankedSentence("Uma sentença longa demais para o orçamento.", 0, 1.0)]
+
+    assert select_sentences_within_budget(ranked, max_length=10) == []
+
+
+@pytest.mark.parametrize("text", [
+    "Uma única sentença bastante longa que não cabe de forma alguma no orçamento de caracteres pedido.",
+    "Palavra " * 4 + "com um a b c d e f g h i j k l m n o p q r s t u v.",
+    "x" * 100,
+])
+def test_summarize_extractive_truncation_respects_max_length(monkeypatch, text):
+    monkeypatch.setattr(summarizer, "rank_sentences", lambda *args: [RankedSentence(text, 0, 1.0)])
+
+    summary = summarizer.summarize_extractive(text, max_length=40, min_length=10)
+
+    assert len(summary) <= 40
+    assert summary.endswith("...")
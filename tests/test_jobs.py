@@ -0,0 +1,115 @@
+# tests/test_jobs.py
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import jobs
+from jobs import JobOwnershipLost, JobRunner, JobStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def _create_jobs(path, count):
+    store = JobStore(path)
+    job_ids = [store.create({"text": f"texto {i}", "method": "abstractive"}, "assinatura") for i in range(count)]
+    store.close()
+    return job_ids
+
+
+def test_concurrent_claims_never_share_a_job(db_path):
+    job_ids = _create_jobs(db_path, 40)
+    claims = []
+    claims_lock = threading.Lock()
+
+    def worker(owner):
+        # Uma conexão por worker, como processos diferentes sobre o mesmo arquivo
+        store = JobStore(db_path)
+        while True:
+            job = store.claim_next(owner)
+            if job is None:
+                break
+            with claims_lock:
+                claims.append((job["id"], job["owner"]))
+        store.close()
+
+    threads = [threading.Thread(target=worker, args=(f"processo-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(job_id for job_id, _owner in claims) == sorted(job_ids)
+
+
+def test_only_stale_jobs_are_requeued(db_path):
+    _create_jobs(db_path, 2)
+    store = JobStore(db_path)
+    alive = store.claim_next("vivo")
+    stopped = store.claim_next("parado")
+    store._execute("UPDATE jobs SET heartbeat_at = heartbeat_at - 120 WHERE id = ?", (stopped["id"],))
+
+    assert store.requeue_stale(60) == 1
+    assert store.get(alive["id"])["status"] == "running"
+    assert store.get(stopped["id"])["status"] == "queued"
+
+
+def test_previous_owner_cannot_write_after_requeue(db_path):
+    (job_id,) = _create_jobs(db_path, 1)
+    first, second = JobStore(db_path), JobStore(db_path)
+    assert first.claim_next("primeiro")["id"] == job_id
+    first.save_chunk(job_id, "primeiro", 0, 3, "resumo antigo")
+
+    first._execute("UPDATE jobs SET heartbeat_at = 0 WHERE id = ?", (job_id,))
+    assert second.requeue_stale(60) == 1
+    assert second.claim_next("segundo")["id"] == job_id
+
+    with pytest.raises(JobOwnershipLost):
+        first.save_chunk(job_id, "primeiro", 1, 3, "resumo duplicado")
+    with pytest.raises(JobOwnershipLost):
+        first.finish(job_id, "primeiro", "resumo")
+
+    second.finish(job_id, "segundo", "resumo final")
+    job = second.get(job_id)
+    assert (job["status"], job["summary"], job["owner"]) == ("done", "resumo final", None)
+
+
+def test_heartbeat_keeps_the_job_running(db_path):
+    (job_id,) = _create_jobs(db_path, 1)
+    store = JobStore(db_path)
+    store.claim_next("dono")
+    store._execute("UPDATE jobs SET heartbeat_at = 0 WHERE id = ?", (job_id,))
+
+    assert store.heartbeat("dono") == 1
+    assert store.requeue_stale(60) == 0
+
+
+def test_worker_survives_database_errors(db_path, monkeypatch):
+    first_id, second_id = _create_jobs(db_path, 2)
+    store = JobStore(db_path)
+    load_chunks = store.load_chunks
+
+    def flaky_load_chunks(job_id):
+        if job_id == first_id:
+            raise sqlite3.OperationalError("database is locked")
+        return load_chunks(job_id)
+
+    monkeypatch.setattr(store, "load_chunks", flaky_load_chunks)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    runner = JobRunner(store, lambda request, completed, on_chunk: "resumo", "assinatura", workers=1)
+    runner.start()
+    try:
+        deadline = time.monotonic() + 5
+        while store.get(second_id)["status"] != "done" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        worker = next(thread for thread in runner._threads if thread.name == "job-worker-0")
+        assert worker.is_alive()
+    finally:
+        runner.stop()
+
+    assert store.get(first_id)["status"] == "failed"
+    assert store.get(second_id)["status"] == "done"
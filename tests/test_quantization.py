@@ -0,0 +1,51 @@
+# tests/test_quantization.py
+import json
+import os
+
+import pytest
+
+import summarizer
+
+
+@pytest.fixture
+def quantized_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "int8"
+    directory.mkdir()
+    (directory / summarizer.QUANTIZED_WEIGHTS_FILE).write_bytes(b"")
+    monkeypatch.setattr(summarizer, "QUANTIZED_MODEL_DIR", str(directory))
+    return directory
+
+
+def _write_metadata(directory, metadata):
+    (directory / summarizer.QUANTIZED_METADATA_FILE).write_text(json.dumps(metadata), encoding="utf-8")
+
+
+def test_artifacts_of_the_configured_source_are_reused(quantized_dir, tmp_path):
+    source = tmp_path / "modelo"
+    source.mkdir()
+    _write_metadata(quantized_dir, summarizer.quantization_source(str(source)))
+
+    assert summarizer._quantized_artifacts_match(str(source), local_only=True)
+
+
+def test_artifacts_of_another_source_are_rebuilt(quantized_dir, tmp_path):
+    old_source, new_source = tmp_path / "antigo", tmp_path / "novo"
+    old_source.mkdir()
+    new_source.mkdir()
+    _write_metadata(quantized_dir, summarizer.quantization_source(str(old_source)))
+
+    assert not summarizer._quantized_artifacts_match(str(new_source), local_only=True)
+
+
+def test_artifacts_without_metadata_are_rebuilt(quantized_dir, tmp_path):
+    source = tmp_path / "modelo"
+    source.mkdir()
+
+    assert not summarizer._quantized_artifacts_match(str(source), local_only=True)
+
+
+def test_local_sources_are_compared_by_absolute_path(tmp_path, monkeypatch):
+    (tmp_path / "modelo").mkdir()
+    monkeypatch.chdir(tmp_path)
+
+    assert summarizer.quantization_source("modelo") == {"source": os.path.join(str(tmp_path), "modelo"), "revision": None}
@@ -0,0 +1,32 @@
+# tests/test_streaming.py
+import pytest
+
+import summarizer
+
+
+def test_stream_forwards_summarize_abstractive_callbacks(monkeypatch):
+    def fake_summarize(text, max_length, min_length, decoding, num_beams, on_chunk=None, on_token=None):
+        on_chunk(0, 2, "primeiro")
+        on_chunk(1, 2, "segundo")
+        for piece in ("Resumo ", "final."):
+            on_token(piece)
+        return "Resumo final."
+
+    monkeypatch.setattr(summarizer, "summarize_abstractive", fake_summarize)
+
+    events = list(summarizer.stream_abstractive("texto", 150, 30))
+
+    assert [event["event"] for event in events] == ["chunk", "chunk", "token", "token", "summary"]
+    assert events[1] == {"event": "chunk", "index": 1, "total": 2, "summary": "segundo"}
+    assert events[-1]["summary"] == "Resumo final."
+    assert 0 <= events[-1]["ttft_ms"] <= events[-1]["total_ms"]
+
+
+def test_stream_raises_errors_from_summarize_abstractive(monkeypatch):
+    def failing_summarize(*args, **kwargs):
+        raise ValueError("max_length deve ser maior que min_length")
+
+    monkeypatch.setattr(summarizer, "summarize_abstractive", failing_summarize)
+
+    with pytest.raises(ValueError):
+        list(summarizer.stream_abstractive("texto", 10, 30))